@@ -0,0 +1,198 @@
+# analysis_stats.py - Wochen-, Monats- und Kategorie-Statistiken ohne ganze Zeilen zu laden
+#
+# Serverseitig über die RPC analysis_stats (siehe supabase_functions.sql), lokal über eine
+# Tages-Rollup-Tabelle, die nach jeder gespeicherten Analyse fortgeschrieben wird.
+#
+#   python analysis_stats.py --period week
+#   python analysis_stats.py --period month --local
+#   python analysis_stats.py --since 2024-01-01 --until 2024-12-31 --json
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+PERIOD_DAYS = {'week': 7, 'month': 30, 'year': 365}
+
+ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_rollup (
+    name TEXT NOT NULL,
+    edition_date TEXT NOT NULL,
+    source TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    articles INTEGER NOT NULL,
+    PRIMARY KEY (name, category, priority)
+);
+CREATE INDEX IF NOT EXISTS daily_rollup_date ON daily_rollup (edition_date);
+"""
+
+
+def period_range(period, today=None):
+    """(since, until) als YYYY-MM-DD für die letzten n Tage inklusive heute"""
+    today = today or datetime.now()
+    since = today - timedelta(days=PERIOD_DAYS[period] - 1)
+    return since.strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+
+
+def fetch_server_stats(supabase, since, until):
+    """Ein RPC-Aufruf mit fertigen Aggregaten; ohne RPC schmaler Select nur der Zählspalten"""
+    try:
+        result = supabase.rpc('analysis_stats', {'since': since, 'until': until}).execute()
+        return result.data
+    except Exception as e:
+        logging.warning(f"⚠️ RPC analysis_stats nicht verfügbar, nutze schmalen Select (ohne Kategorien): {e}")
+
+    result = supabase.table('analyses') \
+        .select('total_articles, high_priority_count, medium_priority_count, created_at, '
+                'source:analysis_metadata->>source, edition_date:analysis_metadata->>edition_date', count='exact') \
+        .gte('created_at', since).lte('created_at', f"{until}T23:59:59").execute()
+
+    days = defaultdict(lambda: {'analyses': 0, 'articles': 0, 'high_priority': 0})
+    for row in result.data:
+        day = days[(row.get('edition_date') or row['created_at'][:10], row.get('source') or 'unbekannt')]
+        day['analyses'] += 1
+        day['articles'] += row['total_articles'] or 0
+        day['high_priority'] += row['high_priority_count'] or 0
+
+    return {
+        'since': since,
+        'until': until,
+        'totals': {
+            'analyses': result.count if result.count is not None else len(result.data),
+            'articles': sum(row['total_articles'] or 0 for row in result.data),
+            'high_priority': sum(row['high_priority_count'] or 0 for row in result.data),
+            'medium_priority': sum(row['medium_priority_count'] or 0 for row in result.data),
+        },
+        'days': [
+            {'edition_date': date, 'source': source, **values}
+            for (date, source), values in sorted(days.items())
+        ],
+        'categories': [],
+    }
+
+
+class DailyRollup:
+    """Lokale Rollup-Tabelle: Artikelzahl pro Ausgabe, Kategorie und Priorität (wenige Zeilen pro Tag)"""
+
+    def __init__(self, db_path, enabled=True):
+        self.db_path = db_path
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.conn = None
+        if enabled:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.executescript(ROLLUP_SCHEMA)
+
+    def record(self, name, source_name, edition_date, articles):
+        """Ersetzt die Zeilen einer Ausgabe (erneutes Speichern zählt nicht doppelt)"""
+        if not self.enabled:
+            return
+
+        counts = defaultdict(int)
+        for article in articles:
+            counts[(article.get('category') or 'Allgemein', article.get('priority') or 'standard')] += 1
+
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM daily_rollup WHERE name = ?', (name,))
+            self.conn.executemany(
+                'INSERT INTO daily_rollup (name, edition_date, source, category, priority, articles) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(name, edition_date, source_name, category, priority, count)
+                 for (category, priority), count in counts.items()]
+            )
+
+    def report(self, since, until):
+        """Gleiche Struktur wie analysis_stats auf dem Server"""
+        with self.lock:
+            totals = self.conn.execute(
+                "SELECT COUNT(DISTINCT name), COALESCE(SUM(articles), 0), "
+                "COALESCE(SUM(CASE WHEN priority = 'höchste' THEN articles END), 0), "
+                "COALESCE(SUM(CASE WHEN priority = 'hohe' THEN articles END), 0) "
+                "FROM daily_rollup WHERE edition_date BETWEEN ? AND ?", (since, until)
+            ).fetchone()
+            days = self.conn.execute(
+                "SELECT edition_date, source, COUNT(DISTINCT name), SUM(articles), "
+                "COALESCE(SUM(CASE WHEN priority = 'höchste' THEN articles END), 0) "
+                "FROM daily_rollup WHERE edition_date BETWEEN ? AND ? "
+                "GROUP BY edition_date, source ORDER BY edition_date, source", (since, until)
+            ).fetchall()
+            categories = self.conn.execute(
+                "SELECT category, priority, SUM(articles) AS total FROM daily_rollup "
+                "WHERE edition_date BETWEEN ? AND ? GROUP BY category, priority ORDER BY total DESC",
+                (since, until)
+            ).fetchall()
+
+        return {
+            'since': since,
+            'until': until,
+            'totals': {'analyses': totals[0], 'articles': totals[1],
+                       'high_priority': totals[2], 'medium_priority': totals[3]},
+            'days': [
+                {'edition_date': d[0], 'source': d[1], 'analyses': d[2], 'articles': d[3], 'high_priority': d[4]}
+                for d in days
+            ],
+            'categories': [{'category': c[0], 'priority': c[1], 'articles': c[2]} for c in categories],
+        }
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def format_report(stats):
+    """Kurzer Textbericht für Log und Workflow-Ausgabe"""
+    totals = stats['totals']
+    lines = [
+        f"📈 Statistiken {stats['since']} bis {stats['until']}:",
+        f"   📰 Analysen: {totals['analyses']}",
+        f"   📄 Artikel: {totals['articles']}",
+        f"   🔥 Hohe Priorität: {totals['high_priority']}",
+        f"   ⭐ Mittlere Priorität: {totals['medium_priority']}",
+    ]
+    categories = defaultdict(int)
+    for entry in stats['categories']:
+        categories[entry['category']] += entry['articles']
+    if categories:
+        lines.append("   🗂️ Kategorien:")
+        lines += [f"      {category}: {count}" for category, count in sorted(categories.items(), key=lambda c: -c[1])]
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Statistiken der automatischen Zeitungsanalyse')
+    parser.add_argument('--period', choices=sorted(PERIOD_DAYS), default='week')
+    parser.add_argument('--since', help='Erstes Ausgabedatum (YYYY-MM-DD), überschreibt --period')
+    parser.add_argument('--until', help='Letztes Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--local', action='store_true', help='Lokale Rollup-Tabelle statt Supabase')
+    parser.add_argument('--rollup', default=os.getenv('STATS_ROLLUP_PATH', '.cache/stats_rollup.sqlite'))
+    parser.add_argument('--json', action='store_true', help='Bericht als JSON ausgeben')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    since, until = period_range(args.period)
+    since, until = args.since or since, args.until or until
+
+    if args.local:
+        stats = DailyRollup(args.rollup).report(since, until)
+    else:
+        from dotenv import load_dotenv
+        from supabase import create_client
+        load_dotenv()
+        url, key = os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_ANON_KEY')
+        if not url or not key:
+            sys.exit("❌ Supabase Credentials fehlen!")
+        stats = fetch_server_stats(create_client(url, key), since, until)
+
+    print(json.dumps(stats, ensure_ascii=False, indent=2) if args.json else format_report(stats))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+# analytics_export.py - Spaltenorientierter Export der Analysen (Parquet, nach Ausgabedatum partitioniert)
+#
+# Pro Ausgabe eine Datei je Tabelle in Hive-Partitionen edition_date=YYYY-MM-DD:
+#   .cache/analytics/articles/edition_date=2024-05-01/AUTO_Volksstimme_20240501.parquet
+#   .cache/analytics/analyses/edition_date=2024-05-01/AUTO_Volksstimme_20240501.parquet
+# Neue Ausgaben kommen als neue Dateien hinzu, erneutes Speichern ersetzt nur die Datei der Ausgabe.
+#
+#   python analytics_export.py --import-supabase
+#   python analytics_export.py --since 2024-01-01 --columns source,category,priority
+#
+# Im Dashboard lädt pandas nur die benötigten Spalten und Partitionen:
+#   from analytics_export import load_articles
+#   df = load_articles('.cache/analytics', columns=['category', 'priority'], since='2024-01-01')
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from datetime import datetime
+
+# (Spalte, pyarrow-Typ) - edition_date steckt im Verzeichnisnamen, nicht in der Datei
+ARTICLE_COLUMNS = [
+    ('analysis_name', 'string'), ('analysis_id', 'string'), ('source', 'string'), ('title', 'string'),
+    ('category', 'string'), ('priority', 'string'), ('page_number', 'string'), ('page', 'int32'),
+    ('summary', 'string'), ('relevance', 'string'),
+]
+ANALYSIS_COLUMNS = [
+    ('name', 'string'), ('analysis_id', 'string'), ('source', 'string'), ('total_articles', 'int32'),
+    ('high_priority_count', 'int32'), ('medium_priority_count', 'int32'), ('text_length', 'int64'),
+    ('exported_at', 'string'), ('analysis_metadata', 'string'),
+]
+TABLES = {'articles': ARTICLE_COLUMNS, 'analyses': ANALYSIS_COLUMNS}
+
+
+def arrow_available():
+    """True, wenn pyarrow installiert ist (optional, siehe requirements.txt)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _schema(columns):
+    import pyarrow as pa
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name in columns])
+
+
+def _page_int(page_number):
+    match = re.search(r'\d+', str(page_number or ''))
+    return int(match.group()) if match else None
+
+
+class AnalyticsExport:
+    """Schreibt jede gespeicherte Ausgabe als Parquet-Dateien (Artikel, Analyse) in ihre Datumspartition"""
+
+    def __init__(self, export_dir, enabled=True, compression='zstd'):
+        self.export_dir = export_dir
+        self.compression = compression
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self._available = None
+
+    def available(self):
+        """pyarrow wird erst beim ersten Export geprüft (hält den Start schlank)"""
+        if self._available is None:
+            self._available = self.enabled and arrow_available()
+            if self.enabled and not self._available:
+                logging.warning("⚠️ pyarrow nicht installiert - Parquet-Export deaktiviert")
+        return self._available
+
+    def _path(self, table, name, edition_date):
+        return os.path.join(self.export_dir, table, f"edition_date={edition_date}", f"{name}.parquet")
+
+    def _write(self, table, name, edition_date, rows):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        path = self._path(table, name, edition_date)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        arrow_table = pa.Table.from_pylist(rows, schema=_schema(TABLES[table]))
+        # Punkt-Präfix: halbfertige Dateien ignorieren pyarrow und pandas beim Lesen
+        tmp_path = os.path.join(os.path.dirname(path), f".{name}.parquet.tmp")
+        pq.write_table(arrow_table, tmp_path, compression=self.compression)
+        os.replace(tmp_path, path)
+
+    def add_analysis(self, name, source_name, edition_date, text_length, articles, analysis_id=None, metadata=None):
+        """Exportiert eine Ausgabe (ersetzt einen früheren Export derselben Ausgabe)"""
+        if not self.available():
+            return False
+
+        analysis_id = None if analysis_id is None else str(analysis_id)
+        article_rows = [
+            {
+                'analysis_name': name,
+                'analysis_id': analysis_id,
+                'source': source_name,
+                'title': article.get('title'),
+                'category': article.get('category'),
+                'priority': article.get('priority'),
+                'page_number': str(article.get('page') or ''),
+                'page': _page_int(article.get('page')),
+                'summary': article.get('summary'),
+                'relevance': article.get('relevance'),
+            }
+            for article in articles
+        ]
+        analysis_row = {
+            'name': name,
+            'analysis_id': analysis_id,
+            'source': source_name,
+            'total_articles': len(articles),
+            'high_priority_count': sum(1 for a in articles if a.get('priority') == 'höchste'),
+            'medium_priority_count': sum(1 for a in articles if a.get('priority') == 'hohe'),
+            'text_length': text_length,
+            'exported_at': datetime.now().isoformat(),
+            'analysis_metadata': json.dumps(metadata or {}, ensure_ascii=False),
+        }
+
+        with self.lock:
+            self._write('articles', name, edition_date, article_rows)
+            self._write('analyses', name, edition_date, [analysis_row])
+        return True
+
+    def is_exported(self, name, edition_date):
+        return os.path.exists(self._path('analyses', name, edition_date))
+
+    def import_from_supabase(self, supabase, page_size=500):
+        """Übernimmt bestehende Analysen aus Supabase - zum erstmaligen Befüllen"""
+        imported = 0
+        start = 0
+        while True:
+            analyses = supabase.table('analyses').select('id, name, analysis_metadata, created_at') \
+                .order('id').range(start, start + page_size - 1).execute().data
+            if not analyses:
+                break
+            for analysis in analyses:
+                metadata = analysis.get('analysis_metadata') or {}
+                edition_date = metadata.get('edition_date') or analysis['created_at'][:10]
+                if self.is_exported(analysis['name'], edition_date):
+                    continue
+                articles = supabase.table('articles') \
+                    .select('title, category, priority, page_number, summary, relevance') \
+                    .eq('analysis_id', analysis['id']).execute().data
+                self.add_analysis(
+                    analysis['name'],
+                    metadata.get('source', 'unbekannt'),
+                    edition_date,
+                    metadata.get('text_length'),
+                    [{**article, 'page': article.get('page_number')} for article in articles],
+                    analysis_id=analysis['id'],
+                    metadata=metadata,
+                )
+                imported += 1
+            start += page_size
+        logging.info(f"📥 {imported} Analysen aus Supabase nach Parquet exportiert")
+        return imported
+
+
+def _load(export_dir, table, columns=None, since=None, until=None, sources=None):
+    """Liest nur die angefragten Spalten; Datums- und Quellenfilter wirken auf Partitionen bzw. Row-Groups"""
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    path = os.path.join(export_dir, table)
+    partitioning = ds.partitioning(pa.schema([('edition_date', pa.string())]), flavor='hive')
+    if not os.path.isdir(path):
+        schema = _schema(TABLES[table]).append(pa.field('edition_date', pa.string()))
+        return schema.empty_table().select(columns or schema.names).to_pandas()
+
+    dataset = ds.dataset(path, format='parquet', partitioning=partitioning)
+    expression = None
+    for condition in (
+        ds.field('edition_date') >= since if since else None,
+        ds.field('edition_date') <= until if until else None,
+        ds.field('source').isin(sources) if sources else None,
+    ):
+        if condition is not None:
+            expression = condition if expression is None else expression & condition
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+def load_articles(export_dir, columns=None, since=None, until=None, sources=None):
+    """Artikel als pandas DataFrame (edition_date als Spalte, YYYY-MM-DD)"""
+    return _load(export_dir, 'articles', columns, since, until, sources)
+
+
+def load_analyses(export_dir, columns=None, since=None, until=None, sources=None):
+    """Eine Zeile pro Ausgabe als pandas DataFrame"""
+    return _load(export_dir, 'analyses', columns, since, until, sources)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Parquet-Export der Zeitungsanalysen für Dashboard und Trends')
+    parser.add_argument('--export-dir', default=os.getenv('ANALYTICS_EXPORT_DIR', '.cache/analytics'))
+    parser.add_argument('--import-supabase', action='store_true', help='Bestehende Analysen aus Supabase exportieren')
+    parser.add_argument('--since', help='Ab Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Bis Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--source', action='append', help='Nur diese Quelle (mehrfach möglich)')
+    parser.add_argument('--columns', default='source,category,priority',
+                        help='Spalten für den Überblick (kommagetrennt)')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not arrow_available():
+        sys.exit("❌ pyarrow nicht installiert (pip install pyarrow)")
+
+    if args.import_supabase:
+        from dotenv import load_dotenv
+        from supabase import create_client
+        load_dotenv()
+        AnalyticsExport(args.export_dir).import_from_supabase(
+            create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_ANON_KEY'))
+        )
+
+    columns = [c.strip() for c in args.columns.split(',') if c.strip()]
+    articles = load_articles(args.export_dir, list(dict.fromkeys(columns + ['edition_date'])),
+                             args.since, args.until, args.source)
+    print(f"📦 {len(articles)} Artikel in {articles['edition_date'].nunique()} Ausgabetagen")
+    if len(articles) and columns:
+        print(articles.groupby(columns).size().sort_values(ascending=False).head(20).to_string())
+
+
+if __name__ == '__main__':
+    main()
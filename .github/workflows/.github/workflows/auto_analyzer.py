@@ -1,15 +1,35 @@
 # auto_analyzer.py - Automatischer Zeitungsanalyse-Bot
+# Drittanbieter-Clients (google.generativeai, supabase, pypdf, requests) werden erst bei Bedarf importiert,
+# damit ein Lauf ohne offene Ausgaben (--check-only) nur die Standardbibliothek lädt
 import os
-import time
-import requests
-import google.generativeai as genai
-from supabase import create_client, Client
-from datetime import datetime, timedelta
+from datetime import datetime
 import re
-from pypdf import PdfReader
-import io
 import sys
+import argparse
 import logging
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from rate_limiter import RateLimiter, HostThrottle, is_rate_limit_error, backoff_delay
+from gemini_cache import GeminiCache
+from pdf_pages import iter_pdf_pages, format_page, default_workers
+from pdf_downloader import PdfDownloader
+from ocr import PageOcr
+from dedup import ArticleDeduplicator
+from page_diff import PageFingerprintStore
+from relevance_filter import RelevanceFilter
+from search_index import SearchIndex
+from analysis_stats import DailyRollup
+from analytics_export import AnalyticsExport
+from chunking import TokenChunker, TokenCounter, chunk_pages, split_pages, default_token_budget
+from structured_output import ARTICLE_SCHEMA, split_segments, articles_from_json
+from metrics import RunMetrics, edition_key
+from readiness import ReadinessProbe
+from model_routing import ModelTier, needs_detail
+from checkpoint import CheckpointStore
+from batch_mode import (
+    GeminiBatchBackend, BatchJobStore, BatchCollector, job_entries, PENDING, SUCCEEDED, FAILED, DONE, CACHE_ONLY_PREFIX
+)
 
 # Logging Setup
 logging.basicConfig(
@@ -21,27 +41,258 @@ logging.basicConfig(
     ]
 )
 
+# Markiert noch nicht initialisierte Clients (None heißt: nicht konfiguriert)
+_UNSET = object()
+
+def _today():
+    """Ausgabedatum des laufenden Tages (YYYY-MM-DD)"""
+    return datetime.now().strftime('%Y-%m-%d')
+
+def _env_int(name, default):
+    """Liest eine Ganzzahl aus der Umgebung"""
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        logging.warning(f"⚠️ Ungültiger Wert für {name}, verwende {default}")
+        return default
+
+def _env_float(name, default=None):
+    """Liest eine Kommazahl aus der Umgebung"""
+    try:
+        value = os.getenv(name)
+        return default if value in (None, '') else float(value)
+    except ValueError:
+        logging.warning(f"⚠️ Ungültiger Wert für {name}, verwende {default}")
+        return default
+
+def _env_bool(name, default=False):
+    """Liest einen Wahrheitswert aus der Umgebung"""
+    value = os.getenv(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+def _is_missing_function(error):
+    """True, wenn PostgREST die RPC-Funktion nicht kennt (PGRST202) - nicht bei Timeouts oder Datenfehlern"""
+    if getattr(error, 'code', None) == 'PGRST202':
+        return True
+    message = str(error)
+    return 'PGRST202' in message or 'Could not find the function' in message
+
 class AutoNewspaperAnalyzer:
+    # Bei jeder inhaltlichen Prompt-Änderung erhöhen, damit der Cache neu befüllt wird
+    PROMPT_VERSION = 2
+    
     def __init__(self):
         """Initialisiert den automatischen Analyzer"""
-        self.supabase = self.init_supabase()
-        self.gemini_model = self.init_gemini()
+        self.gemini_model_name = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+        self.structured_output = _env_bool('GEMINI_STRUCTURED_OUTPUT', True)
+        
+        # Clients erst beim ersten Zugriff (siehe supabase / gemini_model)
+        self._client_lock = threading.Lock()
+        self._supabase = _UNSET
+        self._gemini_model = _UNSET
         self.app_url = os.getenv('STREAMLIT_APP_URL', 'https://deine-app.streamlit.app')
         
+        # App-Prüfung läuft neben der Pipeline, ihr Ergebnis landet nur im Laufbericht
+        self.app_probe_deadline = _env_float('APP_PROBE_DEADLINE_SECONDS', 900.0)
+        self.app_probe_base_delay = _env_float('APP_PROBE_BASE_DELAY', 5.0)
+        self.app_probe_max_delay = _env_float('APP_PROBE_MAX_DELAY', 120.0)
+        
+        # Laufbericht: Dauer pro Quelle/Stufe, Tokens, Kosten, Retries, Bytes, Zeilen
+        self.metrics = RunMetrics(
+            self.gemini_model_name,
+            price_input=_env_float('GEMINI_PRICE_INPUT_PER_MTOK'),
+            price_output=_env_float('GEMINI_PRICE_OUTPUT_PER_MTOK')
+        )
+        self.run_report_path = os.getenv('RUN_REPORT_PATH', 'run_report.json')
+        self.prometheus_path = os.getenv('METRICS_PROMETHEUS_FILE')
+        
+        # Gemini-Parallelität und Quoten (Free Tier: 15 Anfragen/Min, 1 Mio. Tokens/Min)
+        self.gemini_max_workers = _env_int('GEMINI_MAX_WORKERS', 4)
+        self.gemini_max_retries = _env_int('GEMINI_MAX_RETRIES', 5)
+        self.rate_limiter = RateLimiter(
+            requests_per_minute=_env_int('GEMINI_REQUESTS_PER_MINUTE', 15),
+            tokens_per_minute=_env_int('GEMINI_TOKENS_PER_MINUTE', 1000000)
+        )
+        
+        # Optionale Detailstufe: Chunks mit Artikeln der Priorität höchste/hohe analysiert ein stärkeres Modell
+        # erneut - mit eigener Parallelität und eigenen Quoten (Free Tier Pro: 2 Anfragen/Min, 32.000 Tokens/Min)
+        self.detail_tier = None
+        self.detail_min_articles = _env_int('GEMINI_DETAIL_MIN_ARTICLES', 1)
+        detail_model_name = os.getenv('GEMINI_DETAIL_MODEL', '')
+        if detail_model_name:
+            self.detail_tier = ModelTier(
+                'detail', detail_model_name,
+                max_workers=_env_int('GEMINI_DETAIL_MAX_WORKERS', 2),
+                rate_limiter=RateLimiter(
+                    requests_per_minute=_env_int('GEMINI_DETAIL_REQUESTS_PER_MINUTE', 2),
+                    tokens_per_minute=_env_int('GEMINI_DETAIL_TOKENS_PER_MINUTE', 32000)
+                ),
+                create_model=self.init_gemini
+            )
+            self.metrics.add_tier(
+                'detail', detail_model_name,
+                price_input=_env_float('GEMINI_DETAIL_PRICE_INPUT_PER_MTOK'),
+                price_output=_env_float('GEMINI_DETAIL_PRICE_OUTPUT_PER_MTOK')
+            )
+            self.metrics.set_info('detail_model', detail_model_name)
+        
+        # Quellen parallel verarbeiten, Höflichkeitspause nur pro Host
+        self.source_concurrency = _env_int('SOURCE_CONCURRENCY', 4)
+        self.host_throttle = HostThrottle(_env_int('HOST_DELAY_SECONDS', 10))
+        
+        # Batch-Modus für nicht eilige Ausgaben (ANALYSIS_MODE=batch, BATCH_ON_WEEKENDS, oder 'mode' pro Quelle)
+        self.analysis_mode = os.getenv('ANALYSIS_MODE', 'interactive')
+        self.batch_on_weekends = _env_bool('BATCH_ON_WEEKENDS')
+        self.batch_store = BatchJobStore(os.getenv('BATCH_STATE_DIR', '.cache/batch'))
+        self.batch_backend = None
+        
+        # Checkpoints pro Quelle/Ausgabe, damit ein abgebrochener Lauf nur die restliche Arbeit nachholt
+        self.checkpoints = CheckpointStore(
+            os.getenv('CHECKPOINT_DIR', '.cache/checkpoints'),
+            max_age_days=_env_int('CHECKPOINT_MAX_AGE_DAYS', 3),
+            enabled=not _env_bool('CHECKPOINT_DISABLED'),
+        )
+        
+        # Lokaler Volltext-Index und Tages-Rollups, geöffnet erst beim ersten Speichern (siehe search_index / stats_rollup)
+        self._search_index = _UNSET
+        self._stats_rollup = _UNSET
+        
+        # Parquet-Export pro Ausgabe für Dashboard und Trendauswertungen (optional: pyarrow)
+        self.analytics_export = AnalyticsExport(
+            os.getenv('ANALYTICS_EXPORT_DIR', '.cache/analytics'),
+            enabled=_env_bool('ANALYTICS_EXPORT_ENABLED', True)
+        )
+        
+        # Datenbank: ein RPC-Aufruf pro Ausgabe, sonst Artikel in Batches
+        self.use_save_rpc = _env_bool('SUPABASE_SAVE_RPC', True)
+        self.article_batch_size = _env_int('ARTICLE_BATCH_SIZE', 500)
+        
+        # Deduplizierung über Chunks, Ausgaben und die letzten Tage
+        self.deduplicator = ArticleDeduplicator(
+            index_path=os.getenv('DEDUP_INDEX_PATH', '.cache/dedup_index.json'),
+            window_days=_env_int('DEDUP_WINDOW_DAYS', 7),
+            max_distance=_env_int('DEDUP_MAX_DISTANCE', 3),
+            skip_seen_chunks=_env_bool('DEDUP_SKIP_SEEN_CHUNKS')
+        )
+        
+        # Unveränderte Seiten gegenüber den Vortagen überspringen
+        self.page_store = PageFingerprintStore(
+            store_path=os.getenv('PAGE_DIFF_STORE_PATH', '.cache/page_fingerprints.json'),
+            window_days=_env_int('PAGE_DIFF_WINDOW_DAYS', 3),
+            max_distance=_env_int('PAGE_DIFF_MAX_DISTANCE', 3),
+            keep_chars=_env_int('PAGE_DIFF_KEEP_CHARS', 300),
+            enabled=_env_bool('PAGE_DIFF_ENABLED', True)
+        )
+        
+        # Lokaler Vorfilter: klar irrelevante Abschnitte (Anzeigen, Wetter, TV, ...) gehen nicht an Gemini
+        self.relevance_filter = RelevanceFilter(
+            model_path=os.getenv('RELEVANCE_MODEL_PATH', '.cache/relevance_model.json'),
+            drop_threshold=_env_float('RELEVANCE_DROP_THRESHOLD', -0.8),
+            trim_threshold=_env_float('RELEVANCE_TRIM_THRESHOLD', -0.3),
+            keep_chars=_env_int('RELEVANCE_KEEP_CHARS', 200),
+            audit_path=os.getenv('RELEVANCE_AUDIT_LOG', '.cache/relevance_audit.jsonl'),
+            enabled=_env_bool('RELEVANCE_FILTER_ENABLED', True)
+        )
+        self.relevance_retrain_days = _env_int('RELEVANCE_RETRAIN_DAYS', 7)
+        
+        # PDFs werden direkt auf die Platte gestreamt (ETag/Last-Modified bleiben für den nächsten Lauf)
+        self.pdf_downloader = PdfDownloader(
+            download_dir=os.getenv('PDF_DOWNLOAD_DIR', '.cache/pdf'),
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+            timeout=_env_int('PDF_DOWNLOAD_TIMEOUT', 60),
+            max_resumes=_env_int('PDF_DOWNLOAD_MAX_RESUMES', 3)
+        )
+        
+        # Cache für Chunk-Ergebnisse (GEMINI_CACHE_DISABLED=true umgeht ihn)
+        self.gemini_cache = GeminiCache(
+            cache_dir=os.getenv('GEMINI_CACHE_DIR', '.cache/gemini'),
+            max_age_days=_env_int('GEMINI_CACHE_MAX_AGE_DAYS', 30),
+            max_size_mb=_env_int('GEMINI_CACHE_MAX_SIZE_MB', 200),
+            enabled=not _env_bool('GEMINI_CACHE_DISABLED')
+        )
+        
+        # Chunks nach Token-Budget (CHUNK_TOKEN_BUDGET=0: ganzes Kontextfenster, z.B. eine Ausgabe pro Anfrage)
+        token_budget = _env_int('CHUNK_TOKEN_BUDGET', 8000) or default_token_budget(self.gemini_model_name)
+        get_counter_model = (lambda: self.gemini_model) if _env_bool('GEMINI_COUNT_TOKENS') else None
+        self.chunker = TokenChunker(token_budget, TokenCounter(get_model=get_counter_model))
+        
+        # Prozesse für die seitenweise PDF-Extraktion
+        self.pdf_extract_workers = _env_int('PDF_EXTRACT_WORKERS', default_workers())
+        
+        # OCR nur für gescannte Seiten mit kaum Textebene (optionale Abhängigkeiten, siehe requirements.txt)
+        self.page_ocr = PageOcr(
+            cache_dir=os.getenv('OCR_CACHE_DIR', '.cache/ocr'),
+            min_chars=_env_int('OCR_MIN_CHARS', 200),
+            workers=_env_int('OCR_WORKERS', default_workers()),
+            dpi=_env_int('OCR_DPI', 300),
+            lang=os.getenv('OCR_LANG', 'deu'),
+            enabled=_env_bool('OCR_ENABLED', True)
+        )
+        
         # Zeitungsquellen konfigurieren
         self.newspaper_sources = [
             {
                 'name': 'Mitteldeutsche Zeitung',
                 'pdf_url': 'https://epaper.mz-web.de/today.pdf',  # Beispiel
+                'archive_url': 'https://epaper.mz-web.de/archiv/{date:%Y-%m-%d}.pdf',  # Beispiel, für backfill.py
                 'enabled': True
             },
             {
                 'name': 'Volksstimme',
                 'pdf_url': 'https://epaper.volksstimme.de/today.pdf',  # Beispiel
+                'archive_url': 'https://epaper.volksstimme.de/archiv/{date:%Y%m%d}.pdf',  # Beispiel, für backfill.py
                 'enabled': False
             }
         ]
     
+    @property
+    def supabase(self):
+        """Supabase-Client, beim ersten Zugriff verbunden (None ohne Credentials)"""
+        with self._client_lock:
+            if self._supabase is _UNSET:
+                self._supabase = self.init_supabase()
+            return self._supabase
+    
+    @supabase.setter
+    def supabase(self, client):
+        self._supabase = client
+    
+    @property
+    def gemini_model(self):
+        """Gemini-Modell, beim ersten Zugriff konfiguriert (None ohne API-Key)"""
+        with self._client_lock:
+            if self._gemini_model is _UNSET:
+                self._gemini_model = self.init_gemini()
+            return self._gemini_model
+    
+    @gemini_model.setter
+    def gemini_model(self, model):
+        self._gemini_model = model
+    
+    @property
+    def search_index(self):
+        """Lokaler Volltext-Index (voller Text statt der 10.000 Zeichen in Supabase), beim ersten Zugriff geöffnet"""
+        with self._client_lock:
+            if self._search_index is _UNSET:
+                self._search_index = SearchIndex(
+                    os.getenv('SEARCH_INDEX_PATH', '.cache/search_index.sqlite'),
+                    enabled=_env_bool('SEARCH_INDEX_ENABLED', True)
+                )
+            return self._search_index
+    
+    @property
+    def stats_rollup(self):
+        """Lokale Tages-Rollups für Wochen-/Monatsstatistiken (python analysis_stats.py --local), beim ersten Zugriff geöffnet"""
+        with self._client_lock:
+            if self._stats_rollup is _UNSET:
+                self._stats_rollup = DailyRollup(
+                    os.getenv('STATS_ROLLUP_PATH', '.cache/stats_rollup.sqlite'),
+                    enabled=_env_bool('STATS_ROLLUP_ENABLED', True)
+                )
+            return self._stats_rollup
+    
     def init_supabase(self):
         """Initialisiert Supabase Client"""
         try:
@@ -52,6 +303,7 @@ class AutoNewspaperAnalyzer:
                 logging.error("❌ Supabase Credentials fehlen!")
                 return None
             
+            from supabase import create_client
             supabase = create_client(supabase_url, supabase_key)
             logging.info("✅ Supabase verbunden")
             return supabase
@@ -60,226 +312,427 @@ class AutoNewspaperAnalyzer:
             logging.error(f"❌ Supabase Fehler: {e}")
             return None
     
-    def init_gemini(self):
-        """Initialisiert Gemini API"""
+    def init_gemini(self, model_name=None):
+        """Initialisiert Gemini API (Standard: GEMINI_MODEL, sonst das Modell einer weiteren Stufe)"""
+        model_name = model_name or self.gemini_model_name
         try:
             api_key = os.getenv('GEMINI_API_KEY')
             if not api_key:
                 logging.error("❌ Gemini API Key fehlt!")
                 return None
             
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-1.5-flash')
-            logging.info("✅ Gemini API konfiguriert")
+            
+            # JSON-Modus: Gemini liefert direkt eine Artikelliste nach Schema
+            generation_config = None
+            if self.structured_output:
+                generation_config = genai.GenerationConfig(
+                    response_mime_type='application/json',
+                    response_schema=ARTICLE_SCHEMA
+                )
+            
+            model = genai.GenerativeModel(model_name, generation_config=generation_config)
+            logging.info(f"✅ Gemini API konfiguriert ({model_name})")
             return model
             
         except Exception as e:
             logging.error(f"❌ Gemini Fehler: {e}")
             return None
     
+    def probe_app(self):
+        """Ein Versuch der App-Prüfung; Fehler gehen an den Aufrufer (ReadinessProbe hält sie als last_error fest)"""
+        import requests
+        response = requests.get(self.app_url, timeout=30)
+        if response.status_code != 200:
+            raise RuntimeError(f"App antwortet mit Status {response.status_code}")
+        logging.info(f"✅ App ist online: {self.app_url}")
+        return True
+    
     def check_app_status(self):
         """Prüft ob die Streamlit App online ist"""
         try:
-            response = requests.get(self.app_url, timeout=30)
-            if response.status_code == 200:
-                logging.info(f"✅ App ist online: {self.app_url}")
-                return True
-            else:
-                logging.warning(f"⚠️ App antwortet mit Status {response.status_code}")
-                return False
+            return self.probe_app()
         except Exception as e:
             logging.error(f"❌ App nicht erreichbar: {e}")
             return False
     
-    def wait_for_app_recovery(self, max_retries=5):
-        """Wartet bis die App wieder online ist"""
-        for attempt in range(max_retries):
-            if self.check_app_status():
-                return True
-            
-            wait_time = 180  # 3 Minuten
-            logging.info(f"⏳ Warte {wait_time} Sekunden... (Versuch {attempt + 1}/{max_retries})")
-            time.sleep(wait_time)
-        
-        logging.error("❌ App konnte nicht erreicht werden nach mehreren Versuchen")
-        return False
+    def start_app_probe(self):
+        """Startet die App-Prüfung im Hintergrund (Backoff mit Jitter bis zur Deadline)"""
+        return ReadinessProbe(
+            self.probe_app,
+            deadline=self.app_probe_deadline,
+            base_delay=self.app_probe_base_delay,
+            max_delay=self.app_probe_max_delay
+        ).start()
     
     def download_pdf(self, source):
-        """Lädt PDF von einer Zeitungsquelle herunter"""
+        """Lädt PDF von einer Zeitungsquelle herunter und liefert den Dateipfad"""
         try:
             logging.info(f"📥 Lade PDF herunter: {source['name']}")
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
+            # Archivausgaben bekommen eigene Dateien, damit parallele Daten sich nicht überschreiben
+            download_name = source['name']
+            if source.get('edition_date'):
+                download_name = f"{source['name']}_{source['edition_date']}"
             
-            response = requests.get(source['pdf_url'], headers=headers, timeout=60)
-            response.raise_for_status()
+            metrics_key = edition_key(source['name'], source.get('edition_date') or _today())
+            self.host_throttle.wait(source['pdf_url'])
+            with self.metrics.span(metrics_key, 'download'):
+                pdf_path, changed = self.pdf_downloader.download(download_name, source['pdf_url'])
             
-            if response.headers.get('content-type', '').startswith('application/pdf'):
-                logging.info(f"✅ PDF erfolgreich heruntergeladen: {len(response.content)} bytes")
-                return response.content
+            if changed:
+                self.metrics.incr(metrics_key, 'bytes_downloaded', os.path.getsize(pdf_path))
             else:
-                logging.error(f"❌ Kein PDF erhalten, Content-Type: {response.headers.get('content-type')}")
-                return None
+                self.metrics.incr(metrics_key, 'downloads_not_modified')
+            return pdf_path
                 
         except Exception as e:
             logging.error(f"❌ Fehler beim PDF-Download von {source['name']}: {e}")
             return None
     
-    def extract_pdf_text(self, pdf_content):
+    def iter_pdf_pages(self, pdf_source, metrics_key=None):
+        """Liefert (Seitennummer, Text) seitenweise aus Pfad oder Bytes, große PDFs parallel, Scans per OCR"""
+        try:
+            ocr_stats = {}
+            pages = iter_pdf_pages(pdf_source, workers=self.pdf_extract_workers)
+            yield from self.page_ocr.process(pdf_source, pages, ocr_stats)
+            if metrics_key:
+                for name, value in ocr_stats.items():
+                    self.metrics.incr(metrics_key, name, value)
+        except Exception as e:
+            logging.error(f"❌ PDF-Text-Extraktion fehlgeschlagen: {e}")
+            raise
+    
+    def extract_pdf_text(self, pdf_source):
         """Extrahiert Text aus PDF"""
         try:
-            pdf_reader = PdfReader(io.BytesIO(pdf_content))
-            text = ""
-            
-            logging.info(f"📄 PDF hat {len(pdf_reader.pages)} Seiten")
-            
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text()
-                text += f"=== SEITE {page_num} ===\n{page_text}\n\n"
-            
+            text = ''.join(format_page(page_num, page_text) for page_num, page_text in self.iter_pdf_pages(pdf_source))
             logging.info(f"✅ Text extrahiert: {len(text)} Zeichen")
             return text
             
-        except Exception as e:
-            logging.error(f"❌ PDF-Text-Extraktion fehlgeschlagen: {e}")
+        except Exception:
             return None
     
+    def filter_pages(self, pages, source_name, edition_date, stats):
+        """Seitenabgleich mit den Vortagen, danach lokaler Relevanzfilter über die Abschnitte"""
+        pages = self.page_store.filter_pages(pages, source_name, edition_date, stats)
+        return self.relevance_filter.filter_pages(pages, source_name, edition_date, stats)
+    
+    def collect_pages(self, pages, collected_pages, checkpoint=None):
+        """Reicht den Seitenstrom durch und sammelt den vollständigen Text für die Datenbank"""
+        raw_pages = []
+        for page_num, page_text in pages:
+            collected_pages.append(format_page(page_num, page_text))
+            raw_pages.append((page_num, page_text))
+            yield page_num, page_text
+        
+        # Erst nach vollständiger Extraktion sichern - ein halber Seitenstrom wird beim Fortsetzen neu gelesen
+        if checkpoint and not checkpoint.extracted:
+            checkpoint.store_pages(raw_pages)
+    
+    PROMPT_TEMPLATE = textwrap.dedent("""\
+        AUFTRAG: Analysiere diesen Zeitungstext für die Jungen Liberalen (JuLi).
+        Quelle: {source_name}
+        Datum: {date}
+
+        KATEGORIEN & PRIORITÄTEN:
+        🔥 HÖCHSTE PRIORITÄT: Kommunalpolitik, Wirtschaft & Gewerbe, Bildung, Verkehr & Infrastruktur
+        ⚡ HOHE PRIORITÄT: Digitalisierung & Innovation, Umwelt & Nachhaltigkeit, Bürgerbeteiligung & Demokratie, Jugendthemen
+        📰 STANDARD: Kultur & Events, Sport, Soziales, Sonstiges
+
+        {format_instructions}
+
+        WICHTIG:
+        - Verwende immer "JuLi" (nie "JL")
+        - Nur vollständige, relevante Artikel
+        - Fokus auf lokale/regionale Politik
+
+        TEXT CHUNK {chunk_label}:
+        """)
+    
+    FORMAT_LEGACY = textwrap.dedent("""\
+        FORMAT für jeden Artikel:
+        **[KATEGORIE] - Überschrift**
+        📍 Kurze prägnante Zusammenfassung (max. 2 Sätze)
+        📄 Seite: [Seitennummer aus dem Marker "=== SEITE n ==="]
+        🎯 JuLi-Relevanz: Konkrete Begründung für Relevanz
+        ---""")
+    
+    FORMAT_JSON = textwrap.dedent("""\
+        FORMAT: JSON-Liste mit einem Objekt pro Artikel:
+        - category: eine der Kategorien oben
+        - title: Überschrift
+        - summary: Kurze prägnante Zusammenfassung (max. 2 Sätze)
+        - page: Seitennummer aus dem Marker "=== SEITE n ===" oder "nicht erkennbar"
+        - relevance: Konkrete Begründung für die JuLi-Relevanz""")
+    
+    def build_prompt(self, chunk, chunk_label, source_name, edition_date=None):
+        """Erstellt den Analyse-Prompt für einen Chunk (ohne Einrückung, spart Tokens pro Anfrage)"""
+        header = self.PROMPT_TEMPLATE.format(
+            source_name=source_name,
+            date=edition_date or _today(),
+            format_instructions=self.FORMAT_JSON if self.structured_output else self.FORMAT_LEGACY,
+            chunk_label=chunk_label
+        )
+        return header + chunk
+    
+    def chunk_cache_key(self, chunk, model_name=None):
+        """Cache-Schlüssel eines Chunks (Modell, Prompt-Version inkl. Ausgabeformat, Text)"""
+        prompt_version = f"{self.PROMPT_VERSION}-json" if self.structured_output else self.PROMPT_VERSION
+        return GeminiCache.make_key(model_name or self.gemini_model_name, prompt_version, chunk)
+    
+    def analyze_chunk(self, chunk, chunk_num, total_chunks, source_name, checkpoint=None, edition_date=None, tier=None):
+        """Analysiert einen Chunk unter Einhaltung der Quoten (pro Modellstufe), mit Backoff bei 429"""
+        chunk_label = f"{chunk_num}/{total_chunks}" if total_chunks else str(chunk_num)
+        edition_date = edition_date or _today()
+        metrics_key = edition_key(source_name, edition_date)
+        cache_key = self.chunk_cache_key(chunk, tier.model_name if tier else None)
+        rate_limiter = tier.rate_limiter if tier else self.rate_limiter
+        prefix = f"{tier.name}_" if tier else ''
+        
+        # Ergebnis aus einem abgebrochenen Lauf derselben Ausgabe (vor dem Dedup-Check, der den Chunk schon kennt)
+        if checkpoint:
+            result = checkpoint.chunk_result(cache_key)
+            if result is not None:
+                logging.info(f"♻️ Chunk {chunk_label} aus Checkpoint")
+                self.metrics.incr(metrics_key, 'chunks_from_checkpoint')
+                return result
+        
+        # Die Detailstufe bekommt nur Chunks, die die Triage gerade erst als neu gemerkt hat
+        if tier is None and self.deduplicator.chunk_seen(chunk, source_name, edition_date):
+            logging.info(f"⏭️ Chunk {chunk_label} wurde bereits für eine andere Ausgabe analysiert")
+            self.metrics.incr(metrics_key, 'chunks_skipped_seen')
+            return ""
+        if tier is None:
+            self.deduplicator.remember_chunk(chunk, source_name, edition_date)
+        
+        cached = self.gemini_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"💾 Chunk {chunk_label} aus Cache")
+            self.metrics.incr(metrics_key, f'{prefix}gemini_cache_hits')
+            if checkpoint:
+                checkpoint.store_chunk(cache_key, cached)
+            return cached
+        
+        prompt = self.build_prompt(chunk, chunk_label, source_name, edition_date)
+        estimated_tokens = self.chunker.counter.count(prompt)
+        
+        for attempt in range(self.gemini_max_retries + 1):
+            rate_limiter.acquire(estimated_tokens)
+            if tier:
+                logging.info(f"🔬 Detailanalyse Chunk {chunk_label} ({tier.model_name})...")
+            else:
+                logging.info(f"🔍 Analysiere Chunk {chunk_label}...")
+            try:
+                self.metrics.incr(metrics_key, f'{prefix}gemini_calls')
+                model = tier.model if tier else self.gemini_model
+                with self.metrics.span(metrics_key, f'{prefix}gemini'):
+                    response = model.generate_content(prompt)
+                self.metrics.record_usage(metrics_key, response, tier.name if tier else None)
+                rate_limiter.report_success()
+                self.gemini_cache.set(cache_key, response.text)
+                if checkpoint:
+                    checkpoint.store_chunk(cache_key, response.text)
+                return response.text
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.gemini_max_retries:
+                    self.metrics.incr(metrics_key, f'{prefix}gemini_errors')
+                    raise
+                self.metrics.incr(metrics_key, f'{prefix}gemini_retries')
+                wait_time = backoff_delay(attempt)
+                logging.warning(f"⏳ Quote erreicht bei Chunk {chunk_label}, warte {wait_time:.1f}s (Versuch {attempt + 1}/{self.gemini_max_retries})")
+                rate_limiter.report_throttled(wait_time)
+    
+    def triage_chunk(self, detail_executor, chunk, chunk_num, total_chunks, source_name, checkpoint=None, edition_date=None):
+        """Analysiert mit dem Standardmodell; Chunks mit wichtigen Artikeln gehen sofort an die Detailstufe"""
+        result = self.analyze_chunk(chunk, chunk_num, total_chunks, source_name, checkpoint, edition_date)
+        if detail_executor is None or not result:
+            return result, None
+        if not needs_detail(self.parse_articles_from_analysis(result, quiet=True), self.detail_min_articles):
+            return result, None
+        
+        self.metrics.incr(edition_key(source_name, edition_date or _today()), 'chunks_routed_detail')
+        detail_future = detail_executor.submit(
+            self.analyze_chunk, chunk, chunk_num, total_chunks, source_name, checkpoint, edition_date, self.detail_tier
+        )
+        return result, detail_future
+    
+    def analyze_chunks_with_gemini(self, chunks, source_name, total_chunks=None, checkpoint=None, edition_date=None):
+        """Analysiert Chunks parallel, sobald sie eintreffen (Reihenfolge bleibt erhalten)"""
+        detail_executor = None
+        if self.detail_tier:
+            detail_executor = ThreadPoolExecutor(max_workers=self.detail_tier.max_workers, thread_name_prefix='detail')
+        
+        try:
+            with ThreadPoolExecutor(max_workers=self.gemini_max_workers) as executor:
+                futures = [
+                    (chunk, executor.submit(self.triage_chunk, detail_executor, chunk, i, total_chunks, source_name,
+                                            checkpoint, edition_date))
+                    for i, chunk in enumerate(chunks, 1)
+                ]
+                
+                all_analyses = []
+                for i, (chunk, future) in enumerate(futures, 1):
+                    try:
+                        result, detail_future = future.result()
+                    except Exception as e:
+                        logging.error(f"❌ Fehler bei Chunk {i}: {e}")
+                        all_analyses.append(f"❌ Fehler bei Chunk {i}: {e}")
+                        # Seiten dieses Chunks nicht als gesehen merken, sonst fehlen sie beim nächsten Lauf
+                        self.page_store.exclude(source_name, edition_date, chunk_pages(chunk))
+                        continue
+                    
+                    # Ergebnis der Detailstufe ersetzt die Triage; schlägt sie fehl, bleibt die Triage
+                    if detail_future is not None:
+                        try:
+                            result = detail_future.result()
+                        except Exception as e:
+                            logging.warning(f"⚠️ Detailanalyse von Chunk {i} fehlgeschlagen, nutze Triage: {e}")
+                    all_analyses.append(result)
+        finally:
+            if detail_executor:
+                detail_executor.shutdown()
+        
+        logging.info(f"📦 {len(all_analyses)} Chunks analysiert")
+        return '\n\n'.join(all_analyses)
+    
     def analyze_text_with_gemini(self, text, source_name):
-        """Analysiert Text mit Gemini"""
+        """Analysiert Text mit Gemini (Chunks parallel, Reihenfolge bleibt erhalten)"""
         try:
             logging.info("🤖 Starte Gemini-Analyse...")
             
-            # Text in Chunks aufteilen für große Zeitungen
-            chunk_size = 15000
-            chunks = []
-            current_pos = 0
+            filter_stats = {}
+            metrics_key = edition_key(source_name, _today())
+            pages = self.relevance_filter.filter_pages(split_pages(text), source_name, _today(), filter_stats)
+            chunks = list(self.chunker.iter_chunks(pages))
+            logging.info(f"📦 Text in {len(chunks)} Chunks aufgeteilt")
+            for name, value in filter_stats.items():
+                self.metrics.incr(metrics_key, name, value)
             
-            while current_pos < len(text):
-                end_pos = min(current_pos + chunk_size, len(text))
-                
-                if end_pos < len(text):
-                    last_paragraph = text.rfind('\n\n', current_pos, end_pos)
-                    if last_paragraph > current_pos:
-                        end_pos = last_paragraph
-                
-                chunk = text[current_pos:end_pos].strip()
-                if chunk:
-                    chunks.append(chunk)
-                current_pos = end_pos
+            combined_analysis = self.analyze_chunks_with_gemini(chunks, source_name, len(chunks))
+            logging.info("✅ Gemini-Analyse abgeschlossen")
+            return combined_analysis
             
-            logging.info(f"📦 Text in {len(chunks)} Chunks aufgeteilt")
+        except Exception as e:
+            logging.error(f"❌ Gemini-Analyse fehlgeschlagen: {e}")
+            return None
+    
+    def analyze_pdf_with_gemini(self, pdf_source, source_name, checkpoint=None, edition_date=None):
+        """Extrahiert und analysiert im Strom: Chunks gehen an Gemini, während weitere Seiten geparst werden"""
+        try:
+            logging.info("🤖 Starte Gemini-Analyse (Seitenstrom)...")
             
-            all_analyses = []
+            # Voller Text für die Datenbank, an Gemini nur Seiten, die sich gegenüber den Vortagen geändert haben
+            edition_date = edition_date or _today()
+            metrics_key = edition_key(source_name, edition_date)
+            collected_pages = []
+            page_stats = {}
+            pages = checkpoint.extracted_pages() if checkpoint else None
+            if pages is None:
+                pages = self.metrics.timed_iter(self.iter_pdf_pages(pdf_source, metrics_key), metrics_key, 'extraction')
+            pages = self.collect_pages(pages, collected_pages, checkpoint)
+            pages = self.filter_pages(pages, source_name, edition_date, page_stats)
+            chunks = self.chunker.iter_chunks(pages)
+            combined_analysis = self.analyze_chunks_with_gemini(chunks, source_name, checkpoint=checkpoint, edition_date=edition_date)
             
-            for i, chunk in enumerate(chunks, 1):
-                logging.info(f"🔍 Analysiere Chunk {i}/{len(chunks)}...")
-                
-                prompt = f"""
-                AUFTRAG: Analysiere diesen Zeitungstext für die Jungen Liberalen (JuLi).
-                Quelle: {source_name}
-                Datum: {datetime.now().strftime('%Y-%m-%d')}
-
-                KATEGORIEN & PRIORITÄTEN:
-                🔥 HÖCHSTE PRIORITÄT: Kommunalpolitik, Wirtschaft & Gewerbe, Bildung, Verkehr & Infrastruktur
-                ⚡ HOHE PRIORITÄT: Digitalisierung & Innovation, Umwelt & Nachhaltigkeit, Bürgerbeteiligung & Demokratie, Jugendthemen
-                📰 STANDARD: Kultur & Events, Sport, Soziales, Sonstiges
-
-                FORMAT für jeden Artikel:
-                **[KATEGORIE] - Überschrift**
-                📍 Kurze prägnante Zusammenfassung (max. 2 Sätze)
-                📄 Seite: [Seitennummer falls erkennbar]
-                🎯 JuLi-Relevanz: Konkrete Begründung für Relevanz
-                ---
-
-                WICHTIG:
-                - Verwende immer "JuLi" (nie "JL")
-                - Nur vollständige, relevante Artikel
-                - Fokus auf lokale/regionale Politik
-
-                TEXT CHUNK {i}/{len(chunks)}:
-                {chunk}
-                """
-                
-                try:
-                    response = self.gemini_model.generate_content(prompt)
-                    all_analyses.append(response.text)
-                    time.sleep(2)  # Rate limiting
-                except Exception as e:
-                    logging.error(f"❌ Fehler bei Chunk {i}: {e}")
-                    all_analyses.append(f"❌ Fehler bei Chunk {i}: {e}")
+            for name, value in page_stats.items():
+                self.metrics.incr(metrics_key, name, value)
             
-            combined_analysis = '\n\n'.join(all_analyses)
+            text = ''.join(collected_pages)
+            logging.info(f"✅ Text extrahiert: {len(text)} Zeichen")
             logging.info("✅ Gemini-Analyse abgeschlossen")
-            return combined_analysis
+            return combined_analysis, text
             
         except Exception as e:
             logging.error(f"❌ Gemini-Analyse fehlgeschlagen: {e}")
-            return None
+            return None, None
     
-    def parse_articles_from_analysis(self, analysis_text):
-        """Extrahiert strukturierte Artikel-Daten"""
+    def determine_priority(self, category):
+        """Leitet die Priorität aus der Kategorie ab"""
+        category = category.lower()
+        if any(cat in category for cat in ['kommunalpolitik', 'wirtschaft', 'bildung', 'verkehr']):
+            return "höchste"
+        if any(cat in category for cat in ['digitalisierung', 'umwelt', 'bürgerbeteiligung', 'jugend']):
+            return "hohe"
+        return "standard"
+    
+    def parse_legacy_articles(self, analysis_text):
+        """Extrahiert Artikel aus dem Emoji-Textformat per Regex"""
         articles = []
+        article_blocks = analysis_text.split('---')
         
-        try:
-            article_blocks = analysis_text.split('---')
+        for block in article_blocks:
+            block = block.strip()
+            if len(block) < 50:
+                continue
             
-            for block in article_blocks:
-                block = block.strip()
-                if len(block) < 50:
-                    continue
+            # Daten mit Regex extrahieren
+            title_match = re.search(r'\*\*(.*?)\*\*', block)
+            summary_match = re.search(r'📍\s*(.*?)(?=📄|🎯|$)', block, re.DOTALL)
+            page_match = re.search(r'📄.*?Seite:\s*(.*?)(?=🎯|$)', block)
+            relevance_match = re.search(r'🎯\s*JuLi-Relevanz:\s*(.*?)$', block, re.DOTALL)
+            
+            if title_match:
+                title = title_match.group(1).strip()
                 
-                # Daten mit Regex extrahieren
-                title_match = re.search(r'\*\*(.*?)\*\*', block)
-                summary_match = re.search(r'📍\s*(.*?)(?=📄|🎯|$)', block, re.DOTALL)
-                page_match = re.search(r'📄.*?Seite:\s*(.*?)(?=🎯|$)', block)
-                relevance_match = re.search(r'🎯\s*JuLi-Relevanz:\s*(.*?)$', block, re.DOTALL)
+                # Kategorie extrahieren
+                if ' - ' in title:
+                    category, actual_title = title.split(' - ', 1)
+                else:
+                    category = "Allgemein"
+                    actual_title = title
                 
-                if title_match:
-                    title = title_match.group(1).strip()
-                    
-                    # Kategorie extrahieren
-                    if ' - ' in title:
-                        category, actual_title = title.split(' - ', 1)
-                    else:
-                        category = "Allgemein"
-                        actual_title = title
-                    
-                    # Priorität bestimmen
-                    priority = "standard"
-                    if any(cat in category.lower() for cat in ['kommunalpolitik', 'wirtschaft', 'bildung', 'verkehr']):
-                        priority = "höchste"
-                    elif any(cat in category.lower() for cat in ['digitalisierung', 'umwelt', 'bürgerbeteiligung', 'jugend']):
-                        priority = "hohe"
-                    
-                    article_data = {
-                        'title': actual_title,
-                        'category': category,
-                        'priority': priority,
-                        'summary': summary_match.group(1).strip() if summary_match else "",
-                        'page': page_match.group(1).strip() if page_match else "nicht erkennbar",
-                        'relevance': relevance_match.group(1).strip() if relevance_match else ""
-                    }
-                    
-                    articles.append(article_data)
+                article_data = {
+                    'title': actual_title,
+                    'category': category,
+                    'priority': self.determine_priority(category),
+                    'summary': summary_match.group(1).strip() if summary_match else "",
+                    'page': page_match.group(1).strip() if page_match else "nicht erkennbar",
+                    'relevance': relevance_match.group(1).strip() if relevance_match else ""
+                }
+                
+                articles.append(article_data)
+        
+        return articles
+    
+    def parse_articles_from_analysis(self, analysis_text, quiet=False):
+        """Extrahiert strukturierte Artikel-Daten (JSON-Antworten direkt, sonst Regex-Fallback); quiet für Zwischenschritte"""
+        articles = []
+        invalid_count = 0
+        
+        try:
+            for kind, value in split_segments(analysis_text):
+                if kind == 'json':
+                    valid, invalid = articles_from_json(value)
+                    invalid_count += invalid
+                    for article in valid:
+                        article['priority'] = self.determine_priority(article['category'])
+                        articles.append(article)
+                else:
+                    articles.extend(self.parse_legacy_articles(value))
             
-            logging.info(f"📄 {len(articles)} Artikel extrahiert")
+            if not quiet:
+                if invalid_count:
+                    logging.warning(f"⚠️ {invalid_count} ungültige Artikel-Objekte verworfen")
+                logging.info(f"📄 {len(articles)} Artikel extrahiert")
             return articles
             
         except Exception as e:
             logging.error(f"❌ Artikel-Parsing fehlgeschlagen: {e}")
             return []
     
-    def save_to_database(self, source_name, original_text, articles_data):
-        """Speichert Analyse in Supabase"""
+    def save_to_database(self, source_name, original_text, articles_data, edition_date=None, known_articles=0):
+        """Speichert Analyse in Supabase (known_articles: bereits aus anderen Ausgaben/Vortagen gespeicherte Artikel)"""
         try:
             if not self.supabase:
                 logging.error("❌ Keine Supabase-Verbindung")
                 return None
             
             # Analyse-Name generieren
-            analysis_name = f"AUTO_{source_name}_{datetime.now().strftime('%Y%m%d')}"
+            edition_date = edition_date or _today()
+            analysis_name = self.analysis_name(source_name, edition_date)
+            metrics_key = edition_key(source_name, edition_date)
             
             # Prioritäten zählen
             high_count = len([a for a in articles_data if a['priority'] == 'höchste'])
@@ -296,17 +749,15 @@ class AutoNewspaperAnalyzer:
                     'source': source_name,
                     'auto_generated': True,
                     'text_length': len(original_text),
-                    'timestamp': datetime.now().isoformat()
+                    'edition_date': edition_date,
+                    'known_articles': known_articles,
+                    'timestamp': datetime.now().isoformat(),
+                    'run_report': self.metrics.source_report(metrics_key)
                 }
             }
             
-            result = self.supabase.table('analyses').insert(analysis_data).execute()
-            analysis_id = result.data[0]['id']
-            
-            # Artikel speichern
-            for article in articles_data:
-                article_data = {
-                    'analysis_id': analysis_id,
+            article_rows = [
+                {
                     'title': article['title'],
                     'category': article['category'],
                     'priority': article['priority'],
@@ -314,8 +765,17 @@ class AutoNewspaperAnalyzer:
                     'summary': article['summary'],
                     'relevance': article['relevance']
                 }
-                
-                self.supabase.table('articles').insert(article_data).execute()
+                for article in articles_data
+            ]
+            
+            # Bevorzugt ein Round-Trip in einer Transaktion (siehe supabase_functions.sql)
+            analysis_id = None
+            with self.metrics.span(metrics_key, 'persistence'):
+                if self.use_save_rpc:
+                    analysis_id = self.save_with_rpc(analysis_data, article_rows)
+                if analysis_id is None:
+                    analysis_id = self.save_in_batches(analysis_data, article_rows)
+            self.metrics.incr(metrics_key, 'rows_written', 1 + len(article_rows))
             
             logging.info(f"✅ Analyse gespeichert: {analysis_name} (ID: {analysis_id})")
             return analysis_id
@@ -324,16 +784,63 @@ class AutoNewspaperAnalyzer:
             logging.error(f"❌ Datenbank-Speicherung fehlgeschlagen: {e}")
             return None
     
+    def save_with_rpc(self, analysis_data, article_rows):
+        """Speichert Analyse und Artikel transaktional über die RPC-Funktion"""
+        try:
+            result = self.supabase.rpc('save_analysis_with_articles', {
+                'analysis': analysis_data,
+                'articles': article_rows
+            }).execute()
+            return result.data[0] if isinstance(result.data, list) else result.data
+        except Exception as e:
+            # Andere Fehler (Timeout, Netzwerk) können nach dem Commit auftreten - ein Batch-Insert
+            # würde die Analyse dann doppelt anlegen, daher scheitert das Speichern hier
+            if not _is_missing_function(e):
+                raise
+            # Funktion fehlt -> für den Rest des Laufs Batch-Inserts nutzen
+            logging.warning(f"⚠️ RPC save_analysis_with_articles nicht nutzbar, speichere in Batches: {e}")
+            self.use_save_rpc = False
+            return None
+    
+    def save_in_batches(self, analysis_data, article_rows):
+        """Speichert die Analyse und danach die Artikel als Listen-Inserts"""
+        result = self.supabase.table('analyses').insert(analysis_data).execute()
+        analysis_id = result.data[0]['id']
+        
+        try:
+            for start in range(0, len(article_rows), self.article_batch_size):
+                batch = [
+                    {'analysis_id': analysis_id, **row}
+                    for row in article_rows[start:start + self.article_batch_size]
+                ]
+                self.supabase.table('articles').insert(batch).execute()
+        except Exception:
+            # Keine verwaisten Analysen ohne Artikel hinterlassen
+            self.supabase.table('articles').delete().eq('analysis_id', analysis_id).execute()
+            self.supabase.table('analyses').delete().eq('id', analysis_id).execute()
+            raise
+        
+        return analysis_id
+    
+    @staticmethod
+    def analysis_name(source_name, edition_date):
+        """Name der Analyse einer Ausgabe: AUTO_{Quelle}_{YYYYMMDD}"""
+        return f"AUTO_{source_name}_{edition_date.replace('-', '')}"
+    
     def check_already_analyzed_today(self, source_name):
         """Prüft ob heute bereits eine Analyse für diese Quelle existiert"""
+        return self.check_already_analyzed(source_name, _today())
+    
+    def check_already_analyzed(self, source_name, edition_date):
+        """Prüft ob für diese Ausgabe bereits eine Analyse existiert"""
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
-            analysis_name_pattern = f"AUTO_{source_name}_{datetime.now().strftime('%Y%m%d')}"
+            analysis_name_pattern = self.analysis_name(source_name, edition_date)
             
-            result = self.supabase.table('analyses').select('*').eq('name', analysis_name_pattern).execute()
+            # Nur die ID der ersten Zeile - kein original_text über die Leitung
+            result = self.supabase.table('analyses').select('id').eq('name', analysis_name_pattern).limit(1).execute()
             
             if result.data:
-                logging.info(f"ℹ️ Heute bereits analysiert: {source_name}")
+                logging.info(f"ℹ️ Bereits analysiert: {source_name} ({edition_date})")
                 return True
             return False
             
@@ -341,52 +848,257 @@ class AutoNewspaperAnalyzer:
             logging.error(f"❌ Fehler bei Duplikat-Check: {e}")
             return False
     
-    def process_newspaper_source(self, source):
-        """Verarbeitet eine einzelne Zeitungsquelle"""
-        logging.info(f"🗞️ Verarbeite: {source['name']}")
-        
-        # Check ob heute schon analysiert
-        if self.check_already_analyzed_today(source['name']):
-            logging.info(f"⏭️ Überspringe {source['name']} - heute bereits analysiert")
-            return False
+    def pending_sources(self, sources, remote=True):
+        """Quellen mit noch offener Ausgabe: zuerst lokale Checkpoints, dann eine einzige Supabase-Abfrage"""
+        pending = {}
+        for source in sources:
+            edition_date = source.get('edition_date') or _today()
+            if not self.checkpoints.is_persisted(source['name'], edition_date):
+                pending[self.analysis_name(source['name'], edition_date)] = source
         
-        # PDF herunterladen
-        pdf_content = self.download_pdf(source)
-        if not pdf_content:
-            return False
-        
-        # Text extrahieren
-        text = self.extract_pdf_text(pdf_content)
-        if not text:
-            return False
+        if pending and remote and self.supabase:
+            try:
+                result = self.supabase.table('analyses').select('name').in_('name', list(pending)).execute()
+                for row in result.data:
+                    pending.pop(row['name'], None)
+            except Exception as e:
+                logging.warning(f"⚠️ Vorabprüfung in Supabase fehlgeschlagen, prüfe pro Quelle: {e}")
         
-        # Mit Gemini analysieren
-        analysis = self.analyze_text_with_gemini(text, source['name'])
-        if not analysis:
-            return False
+        return list(pending.values())
+    
+    def check_only(self, remote=True):
+        """Schneller Pfad: zählt offene Ausgaben und Batch-Jobs (ohne Gemini, Downloads oder App-Prüfung)"""
+        enabled_sources = [s for s in self.newspaper_sources if s['enabled']]
+        pending = self.pending_sources(enabled_sources, remote=remote)
+        batch_jobs = self.batch_store.pending_jobs()
         
-        # Artikel parsen
-        articles = self.parse_articles_from_analysis(analysis)
-        if not articles:
-            logging.warning(f"⚠️ Keine Artikel gefunden in {source['name']}")
+        if pending or batch_jobs:
+            names = ', '.join(s['name'] for s in pending) or '-'
+            logging.info(f"📋 Offen: {len(pending)} Ausgaben ({names}), {len(batch_jobs)} Batch-Jobs")
+        else:
+            logging.info(f"✅ Nichts zu tun - alle {len(enabled_sources)} Ausgaben sind bereits analysiert")
+        return len(pending) + len(batch_jobs)
+    
+    def finish_source(self, source_name, analysis, text, edition_date, checkpoint=None):
+        """Parst die Analyse, entfernt Duplikate und speichert das Ergebnis"""
+        metrics_key = edition_key(source_name, edition_date)
+        # Artikel parsen und Duplikate (Chunk-Grenzen, andere Ausgaben, Vortage) entfernen
+        with self.metrics.span(metrics_key, 'parsing'):
+            articles = self.parse_articles_from_analysis(analysis)
+        parsed_count = len(articles)
+        with self.metrics.span(metrics_key, 'dedup'):
+            articles = self.deduplicator.merge_duplicates(articles)
+            merged_count = len(articles)
+            articles = self.deduplicator.claim(articles, source_name, edition_date)
+        self.metrics.incr(metrics_key, 'articles', len(articles))
+        if not articles and parsed_count:
+            # Nur Artikel aus anderen Ausgaben/Vortagen: die Analyse wird trotzdem (ohne Artikel) gespeichert,
+            # damit check_already_analyzed die Ausgabe als erledigt erkennt
+            logging.info(f"ℹ️ {source_name} ({edition_date}): alle {parsed_count} Artikel bereits bekannt - speichere Analyse ohne neue Artikel")
+        elif not articles:
+            logging.warning(f"⚠️ Keine Artikel gefunden in {source_name}")
+            self.page_store.discard(source_name, edition_date)
             return False
         
         # In Datenbank speichern
-        analysis_id = self.save_to_database(source['name'], text, articles)
+        analysis_id = self.save_to_database(source_name, text, articles, edition_date, merged_count - len(articles))
         if analysis_id:
+            self.deduplicator.commit()
+            self.page_store.commit(source_name, edition_date)
+            if checkpoint:
+                checkpoint.mark_persisted(analysis_id)
+            self.update_search_index(source_name, edition_date, text, articles, analysis_id)
+            self.update_stats_rollup(source_name, edition_date, articles)
+            self.update_analytics_export(source_name, edition_date, text, articles, analysis_id)
             high_count = len([a for a in articles if a['priority'] == 'höchste'])
             medium_count = len([a for a in articles if a['priority'] == 'hohe'])
             
-            logging.info(f"🎉 Erfolgreich analysiert: {source['name']}")
+            logging.info(f"🎉 Erfolgreich analysiert: {source_name}")
             logging.info(f"   📊 Artikel: {len(articles)} | Hoch: {high_count} | Medium: {medium_count}")
             return True
         
+        # Nicht gespeichert: reservierte Artikel freigeben, damit sie beim nächsten Versuch nicht als bekannt gelten
+        self.deduplicator.release(source_name, edition_date)
+        self.page_store.discard(source_name, edition_date)
         return False
     
+    def update_search_index(self, source_name, edition_date, text, articles, analysis_id):
+        """Schreibt die gespeicherte Analyse in den lokalen Suchindex (Fehler blockieren den Lauf nicht)"""
+        try:
+            with self.metrics.span(edition_key(source_name, edition_date), 'search_index'):
+                self.search_index.add_analysis(
+                    self.analysis_name(source_name, edition_date), source_name, edition_date,
+                    text, articles, analysis_id=analysis_id
+                )
+        except Exception as e:
+            logging.warning(f"⚠️ Suchindex konnte nicht aktualisiert werden: {e}")
+    
+    def update_stats_rollup(self, source_name, edition_date, articles):
+        """Schreibt die Artikelzahlen der Ausgabe in die lokale Rollup-Tabelle"""
+        try:
+            self.stats_rollup.record(self.analysis_name(source_name, edition_date), source_name, edition_date, articles)
+        except Exception as e:
+            logging.warning(f"⚠️ Statistik-Rollup konnte nicht aktualisiert werden: {e}")
+    
+    def update_analytics_export(self, source_name, edition_date, text, articles, analysis_id):
+        """Hängt die gespeicherte Ausgabe an den Parquet-Export an"""
+        try:
+            with self.metrics.span(edition_key(source_name, edition_date), 'analytics_export'):
+                self.analytics_export.add_analysis(
+                    self.analysis_name(source_name, edition_date), source_name, edition_date, len(text), articles,
+                    analysis_id=analysis_id,
+                    metadata={'source': source_name, 'edition_date': edition_date, 'model': self.gemini_model_name}
+                )
+        except Exception as e:
+            logging.warning(f"⚠️ Parquet-Export konnte nicht aktualisiert werden: {e}")
+    
+    def use_batch_mode(self, source, edition_date):
+        """Batch-Modus per Quelle, global oder für Wochenendausgaben (nach Ausgabedatum, nicht Laufdatum)"""
+        mode = source.get('mode', self.analysis_mode)
+        if mode == 'batch':
+            return True
+        return self.batch_on_weekends and datetime.strptime(edition_date, '%Y-%m-%d').weekday() >= 5
+    
+    def get_batch_backend(self):
+        """Erzeugt den Batch-Client erst, wenn er gebraucht wird"""
+        if self.batch_backend is None:
+            generation_config = {}
+            if self.structured_output:
+                generation_config = {'response_mime_type': 'application/json', 'response_schema': ARTICLE_SCHEMA}
+            self.batch_backend = GeminiBatchBackend(os.getenv('GEMINI_API_KEY'), generation_config)
+        return self.batch_backend
+    
+    def prepare_batch_source(self, source, pdf_path, batch_collector, edition_date):
+        """Extrahiert und chunkt eine Ausgabe und legt die Prompts für den gemeinsamen Batch-Job ab"""
+        collected_pages = []
+        page_stats = {}
+        metrics_key = edition_key(source['name'], edition_date)
+        pages = self.metrics.timed_iter(self.iter_pdf_pages(pdf_path, metrics_key), metrics_key, 'extraction')
+        pages = self.collect_pages(pages, collected_pages)
+        pages = self.filter_pages(pages, source['name'], edition_date, page_stats)
+        
+        chunks = []
+        for i, chunk in enumerate(self.chunker.iter_chunks(pages), 1):
+            key = self.chunk_cache_key(chunk)
+            cached = self.gemini_cache.get(key)
+            prompt = None if cached is not None else self.build_prompt(chunk, str(i), source['name'], edition_date)
+            chunks.append((key, prompt, cached))
+        
+        for name, value in page_stats.items():
+            self.metrics.incr(metrics_key, name, value)
+        
+        text_path = self.batch_store.store_text(source['name'], edition_date, ''.join(collected_pages))
+        batch_collector.add_source(source['name'], edition_date, text_path, chunks)
+        logging.info(f"📨 {source['name']}: {len(chunks)} Chunks für Batch-Job vorgemerkt")
+        return True
+    
+    def resume_batch_jobs(self):
+        """Holt Ergebnisse eingereichter Batch-Jobs ab und speichert fertige Quellen"""
+        saved_count = 0
+        
+        for job in self.batch_store.pending_jobs():
+            job_name = job['job_name']
+            try:
+                if job_name.startswith(CACHE_ONLY_PREFIX):
+                    state, results = SUCCEEDED, {}
+                else:
+                    state, results = self.get_batch_backend().poll(job_name, job.get('request_keys'))
+            except Exception as e:
+                logging.error(f"❌ Batch-Job {job_name} nicht abfragbar: {e}")
+                continue
+            
+            if state == PENDING:
+                logging.info(f"⏳ Batch-Job {job_name} läuft noch")
+                continue
+            if state == FAILED:
+                logging.error(f"❌ Batch-Job {job_name} fehlgeschlagen")
+                self.batch_store.update(job_name, status=FAILED)
+                self.batch_store.cleanup(job)
+                continue
+            
+            unsaved = 0
+            for source_name, source in job_entries(job):
+                if source.get('saved'):
+                    continue
+                analyses = []
+                for i, chunk in enumerate(source['chunks'], 1):
+                    result = chunk['result'] if chunk['result'] is not None else results.get(chunk['key'])
+                    if result is None:
+                        analyses.append(f"❌ Fehler bei Chunk {i}: keine Batch-Antwort")
+                        # Ohne Chunk-Text keine Seitenzuordnung: Fingerprints der Ausgabe insgesamt verwerfen
+                        self.page_store.discard(source_name, source['edition_date'])
+                        continue
+                    self.gemini_cache.set(chunk['key'], result)
+                    analyses.append(result)
+                
+                with open(source['text_path'], 'r', encoding='utf-8') as f:
+                    text = f.read()
+                if self.finish_source(source_name, '\n\n'.join(analyses), text, source['edition_date']):
+                    self.batch_store.mark_saved(source)
+                    saved_count += 1
+                else:
+                    unsaved += 1
+            
+            # Erst abschließen, wenn jede Ausgabe gespeichert ist - sonst versucht es der nächste Lauf erneut
+            if unsaved:
+                logging.warning(f"⚠️ Batch-Job {job_name}: {unsaved} Ausgaben nicht gespeichert, bleibt offen")
+                continue
+            self.batch_store.update(job_name, status=DONE)
+            self.batch_store.cleanup(job)
+        
+        return saved_count
+    
+    def process_newspaper_source(self, source, batch_collector=None):
+        """Verarbeitet eine einzelne Zeitungsquelle"""
+        logging.info(f"🗞️ Verarbeite: {source['name']}")
+        edition_date = source.get('edition_date') or _today()
+        batch = batch_collector is not None and self.use_batch_mode(source, edition_date)
+        
+        # Check ob die Ausgabe schon analysiert ist (oder bereits als Batch-Job unterwegs)
+        if self.check_already_analyzed(source['name'], edition_date):
+            logging.info(f"⏭️ Überspringe {source['name']} - Ausgabe {edition_date} bereits analysiert")
+            return False
+        if batch and self.batch_store.has_pending(source['name'], edition_date):
+            logging.info(f"⏭️ Überspringe {source['name']} - Batch-Job läuft bereits")
+            return False
+        
+        if batch:
+            pdf_path = self.download_pdf(source)
+            if not pdf_path:
+                return False
+            return self.prepare_batch_source(source, pdf_path, batch_collector, edition_date)
+        
+        checkpoint = self.checkpoints.open(source['name'], edition_date)
+        if checkpoint and checkpoint.persisted:
+            logging.info(f"⏭️ Überspringe {source['name']} - laut Checkpoint bereits gespeichert")
+            return False
+        
+        # PDF herunterladen (entfällt, wenn die Seiten schon extrahiert oder das PDF unverändert vorliegt)
+        pdf_path = None
+        if not (checkpoint and checkpoint.extracted):
+            pdf_path = checkpoint.downloaded_pdf() if checkpoint else None
+            if not pdf_path:
+                pdf_path = self.download_pdf(source)
+                if not pdf_path:
+                    return False
+                if checkpoint:
+                    checkpoint.record_download(pdf_path)
+        
+        # Text seitenweise extrahieren und direkt mit Gemini analysieren
+        analysis, text = self.analyze_pdf_with_gemini(pdf_path, source['name'], checkpoint, edition_date)
+        if not analysis or not text:
+            return False
+        
+        return self.finish_source(source['name'], analysis, text, edition_date, checkpoint)
+    
     def run_daily_analysis(self):
         """Führt die tägliche automatische Analyse durch"""
         logging.info("🚀 Starte automatische tägliche Zeitungsanalyse")
         
+        # Ist alles schon analysiert, endet der Lauf hier - ohne Gemini-Client, Training oder App-Prüfung
+        if not self.check_only():
+            return True
+        
         # Prüfe Konfiguration
         if not self.supabase:
             logging.error("❌ Supabase nicht konfiguriert")
@@ -396,39 +1108,89 @@ class AutoNewspaperAnalyzer:
             logging.error("❌ Gemini nicht konfiguriert")
             return False
         
-        # Warte auf App-Recovery falls nötig
-        if not self.wait_for_app_recovery():
-            logging.error("❌ App ist nicht erreichbar - breche ab")
-            return False
+        self.gemini_cache.evict()
+        self.checkpoints.prune()
+        if self.relevance_filter.enabled and self.relevance_filter.needs_training(self.relevance_retrain_days):
+            self.relevance_filter.train_from_supabase(self.supabase)
         
-        success_count = 0
+        # Die Analyse hängt nicht von der App ab - nur prüfen und im Laufbericht festhalten
+        app_probe = self.start_app_probe()
+        
+        # Ergebnisse früher eingereichter Batch-Jobs zuerst abholen
+        success_count = self.resume_batch_jobs()
+        batch_collector = BatchCollector()
         enabled_sources = [s for s in self.newspaper_sources if s['enabled']]
         
-        logging.info(f"📰 Verarbeite {len(enabled_sources)} Zeitungsquellen")
+        logging.info(f"📰 Verarbeite {len(enabled_sources)} Zeitungsquellen (max. {self.source_concurrency} parallel)")
         
-        for source in enabled_sources:
-            try:
-                if self.process_newspaper_source(source):
-                    success_count += 1
-                
-                # Pause zwischen Quellen
-                time.sleep(30)
-                
-            except Exception as e:
-                logging.error(f"❌ Fehler bei {source['name']}: {e}")
+        # Während eine Quelle auf Gemini wartet, lädt die nächste bereits ihr PDF
+        with ThreadPoolExecutor(max_workers=self.source_concurrency, thread_name_prefix='quelle') as executor:
+            futures = {
+                executor.submit(self.process_newspaper_source, source, batch_collector): source
+                for source in enabled_sources
+            }
+            
+            for future in as_completed(futures):
+                source = futures[future]
+                try:
+                    if future.result():
+                        success_count += 1
+                except Exception as e:
+                    logging.error(f"❌ Fehler bei {source['name']}: {e}")
+        
+        # Alle Batch-Quellen gehen als ein Job raus; Ergebnisse holt dieser oder ein späterer Lauf ab
+        try:
+            if batch_collector.submit(self.get_batch_backend, self.batch_store, self.gemini_model_name):
+                self.resume_batch_jobs()
+        except Exception as e:
+            logging.error(f"❌ Batch-Job konnte nicht eingereicht werden: {e}")
+            success_count -= len(batch_collector.sources)
+        
+        app_status = app_probe.stop()
+        self.metrics.set_info('app_status', app_status)
         
         # Abschlussbericht
         logging.info(f"✅ Automatische Analyse abgeschlossen:")
         logging.info(f"   📊 Erfolgreiche Analysen: {success_count}/{len(enabled_sources)}")
+        logging.info(f"   💾 Gemini-Cache: {self.gemini_cache.hits} Treffer | {self.gemini_cache.misses} Fehlzugriffe")
+        logging.info(f"   🌐 App-Status: {app_status['state']} ({app_status['attempts']} Prüfungen)")
         
         return success_count > 0
+    
+    def write_run_report(self):
+        """Schreibt den Laufbericht (JSON, optional Prometheus-Textfile)"""
+        try:
+            report = self.metrics.write_json(self.run_report_path)
+            if self.prometheus_path:
+                self.metrics.write_prometheus(self.prometheus_path)
+            totals = report['totals']
+            logging.info(f"   🔢 Tokens: {totals.get('prompt_tokens', 0)} Prompt | {totals.get('response_tokens', 0)} Antwort | ca. ${totals.get('cost_usd', 0):.4f}")
+        except Exception as e:
+            logging.error(f"❌ Laufbericht konnte nicht geschrieben werden: {e}")
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Automatische tägliche Zeitungsanalyse')
+    parser.add_argument('--check-only', action='store_true',
+                        help='Nur prüfen, ob Ausgaben offen sind (schreibt pending=<n> nach $GITHUB_OUTPUT)')
+    parser.add_argument('--local', action='store_true', help='Mit --check-only: nur lokale Checkpoints, ohne Supabase')
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """Hauptfunktion für automatische Ausführung"""
+    args = parse_args(argv)
     analyzer = AutoNewspaperAnalyzer()
     
+    if args.check_only:
+        pending = analyzer.check_only(remote=not args.local)
+        github_output = os.getenv('GITHUB_OUTPUT')
+        if github_output:
+            with open(github_output, 'a', encoding='utf-8') as f:
+                f.write(f"pending={pending}\n")
+        sys.exit(0)
+    
     # Führe tägliche Analyse durch
     success = analyzer.run_daily_analysis()
+    analyzer.write_run_report()
     
     if success:
         logging.info("🎉 Automatische Analyse erfolgreich!")
@@ -0,0 +1,188 @@
+# backfill.py - Nachträgliche Analyse archivierter Ausgaben über einen Datumsbereich
+#
+# Verteilt (Quelle, Datum)-Paare auf parallele Worker und nutzt dieselben Schritte wie der
+# tägliche Lauf (Download, Extraktion, Gemini, Speicherung) mit dem jeweiligen Ausgabedatum.
+# Bereits gespeicherte Ausgaben werden übersprungen, ein Abbruch kann einfach neu gestartet werden.
+#
+#   python backfill.py --start 2024-01-01 --end 2024-12-31 --workers 8 --rpm 120
+#   python backfill.py --start 2024-06-01 --end 2024-06-30 \
+#       --source "Mitteldeutsche Zeitung=https://epaper.mz-web.de/archiv/{date:%Y-%m-%d}.pdf"
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+
+def parse_date(value):
+    return datetime.strptime(value, '%Y-%m-%d')
+
+
+def date_range(start, end, skip_weekdays=()):
+    """Alle Tage von start bis end (inklusive), ohne die angegebenen Wochentage (0=Montag)"""
+    day = start
+    while day <= end:
+        if day.weekday() not in skip_weekdays:
+            yield day
+        day += timedelta(days=1)
+
+
+def parse_source(value):
+    """'Name=URL-Vorlage' mit {date:...}-Platzhalter, z.B. https://.../{date:%Y%m%d}.pdf"""
+    name, sep, template = value.partition('=')
+    if not sep or '{date' not in template:
+        raise argparse.ArgumentTypeError(f"Erwartet 'Name=URL-Vorlage' mit {{date:...}}: {value}")
+    return {'name': name.strip(), 'archive_url': template.strip()}
+
+
+def build_jobs(sources, days):
+    """Ein Quellen-Dict pro (Quelle, Datum) mit fertiger PDF-URL und Ausgabedatum"""
+    return [
+        {
+            'name': source['name'],
+            'pdf_url': source['archive_url'].format(date=day),
+            'edition_date': day.strftime('%Y-%m-%d'),
+            'enabled': True,
+        }
+        for day in days
+        for source in sources
+    ]
+
+
+def done_editions(analyzer, source_name, start, end):
+    """Namen der bereits gespeicherten Analysen einer Quelle im Zeitraum (eine Abfrage pro Quelle)"""
+    try:
+        result = analyzer.supabase.table('analyses').select('name') \
+            .gte('name', analyzer.analysis_name(source_name, start.strftime('%Y-%m-%d'))) \
+            .lte('name', analyzer.analysis_name(source_name, end.strftime('%Y-%m-%d'))) \
+            .execute()
+        return {row['name'] for row in result.data}
+    except Exception as e:
+        logging.warning(f"⚠️ Erledigte Ausgaben für {source_name} nicht abrufbar, prüfe einzeln: {e}")
+        return set()
+
+
+class Progress:
+    """Zählt erledigte Paare und schätzt die Restlaufzeit"""
+
+    def __init__(self, total):
+        self.total = total
+        self.counts = {'ok': 0, 'failed': 0}
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def update(self, job, status):
+        with self.lock:
+            self.counts[status] += 1
+            finished = sum(self.counts.values())
+            elapsed = time.perf_counter() - self.start
+        eta = elapsed / finished * (self.total - finished)
+        symbol = '✅' if status == 'ok' else '❌'
+        logging.info(
+            f"📈 [{finished}/{self.total}] {symbol} {job['name']} {job['edition_date']} "
+            f"| ok {self.counts['ok']} | Fehler {self.counts['failed']} | Rest ca. {eta / 60:.1f} min"
+        )
+
+
+def run_backfill(analyzer, jobs, workers, keep_pdfs=False, batch_collector=None):
+    """Verarbeitet alle Paare mit begrenzter Parallelität und liefert die Zähler"""
+    progress = Progress(len(jobs))
+
+    def process(job):
+        try:
+            return 'ok' if analyzer.process_newspaper_source(job, batch_collector) else 'failed'
+        finally:
+            if not keep_pdfs:
+                analyzer.pdf_downloader.remove(f"{job['name']}_{job['edition_date']}")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='backfill') as executor:
+        futures = {executor.submit(process, job): job for job in jobs}
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                status = future.result()
+            except Exception as e:
+                logging.error(f"❌ Fehler bei {job['name']} {job['edition_date']}: {e}")
+                status = 'failed'
+            progress.update(job, status)
+
+    return progress.counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Archivausgaben eines Zeitraums nachträglich analysieren')
+    parser.add_argument('--start', type=parse_date, required=True, help='Erstes Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--end', type=parse_date, required=True, help='Letztes Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--source', type=parse_source, action='append', dest='sources',
+                        help="'Name=URL-Vorlage', mehrfach möglich; sonst archive_url der aktivierten Quellen")
+    parser.add_argument('--skip-weekday', type=int, action='append', default=[],
+                        help='Wochentag ohne Ausgabe überspringen (0=Montag, 6=Sonntag), mehrfach möglich')
+    parser.add_argument('--workers', type=int, default=4, help='Parallel verarbeitete Ausgaben')
+    parser.add_argument('--gemini-workers', type=int, help='Parallele Gemini-Anfragen pro Ausgabe')
+    parser.add_argument('--rpm', type=int, help='Gemini-Anfragen pro Minute (alle Worker zusammen)')
+    parser.add_argument('--tpm', type=int, help='Gemini-Tokens pro Minute (alle Worker zusammen)')
+    parser.add_argument('--host-delay', type=float, help='Mindestabstand zwischen Downloads pro Host (s)')
+    parser.add_argument('--page-diff', action='store_true',
+                        help='Seitenabgleich mit Nachbarausgaben (Reihenfolge ist im Backfill nicht garantiert)')
+    parser.add_argument('--batch', action='store_true', help='Als Batch-Job einreichen (günstiger, asynchron)')
+    parser.add_argument('--keep-pdfs', action='store_true', help='Heruntergeladene Archiv-PDFs behalten')
+    parser.add_argument('--dry-run', action='store_true', help='Nur offene Paare auflisten')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.end < args.start:
+        sys.exit("❌ --end liegt vor --start")
+
+    # Limits vor dem Erzeugen des Analyzers setzen, damit alle Worker einen Limiter teilen
+    for name, value in (('GEMINI_REQUESTS_PER_MINUTE', args.rpm), ('GEMINI_TOKENS_PER_MINUTE', args.tpm),
+                        ('GEMINI_MAX_WORKERS', args.gemini_workers), ('HOST_DELAY_SECONDS', args.host_delay)):
+        if value is not None:
+            os.environ[name] = str(value)
+
+    from auto_analyzer import AutoNewspaperAnalyzer, BatchCollector
+    analyzer = AutoNewspaperAnalyzer()
+    if not analyzer.supabase or not analyzer.gemini_model:
+        sys.exit("❌ Supabase oder Gemini nicht konfiguriert")
+    analyzer.page_store.enabled = args.page_diff
+
+    sources = args.sources or [s for s in analyzer.newspaper_sources if s['enabled'] and s.get('archive_url')]
+    if not sources:
+        sys.exit("❌ Keine Quelle mit Archiv-URL - --source 'Name=URL-Vorlage' angeben")
+
+    days = list(date_range(args.start, args.end, set(args.skip_weekday)))
+    done = set()
+    for source in sources:
+        done |= done_editions(analyzer, source['name'], args.start, args.end)
+    jobs = [
+        job for job in build_jobs(sources, days)
+        if analyzer.analysis_name(job['name'], job['edition_date']) not in done
+    ]
+    for job in jobs:
+        job['mode'] = 'batch' if args.batch else 'interactive'
+
+    logging.info(f"📚 Backfill {args.start:%Y-%m-%d} bis {args.end:%Y-%m-%d}: {len(jobs)} offen, "
+                 f"{len(days) * len(sources) - len(jobs)} bereits erledigt ({len(sources)} Quellen)")
+    if args.dry_run:
+        for job in jobs:
+            print(f"{job['edition_date']}  {job['name']}  {job['pdf_url']}")
+        return
+
+    analyzer.gemini_cache.evict()
+    batch_collector = BatchCollector() if args.batch else None
+    counts = run_backfill(analyzer, jobs, args.workers, args.keep_pdfs, batch_collector)
+    if batch_collector:
+        # Ergebnisse holt der nächste tägliche Lauf (resume_batch_jobs) ab
+        batch_collector.submit(analyzer.get_batch_backend, analyzer.batch_store, analyzer.gemini_model_name)
+
+    analyzer.write_run_report()
+    logging.info(f"🏁 Backfill abgeschlossen: {counts['ok']} ok | {counts['failed']} Fehler")
+    sys.exit(0 if counts['failed'] == 0 else 1)
+
+
+if __name__ == '__main__':
+    main()
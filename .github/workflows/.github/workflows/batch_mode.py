@@ -0,0 +1,193 @@
+# batch_mode.py - Batch-Analyse über die Gemini Batch API für nicht eilige Ausgaben
+import json
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+
+PENDING, SUCCEEDED, FAILED, DONE = 'pending', 'succeeded', 'failed', 'done'
+
+# Jobs, deren Chunks komplett aus dem Cache kamen, gehen nie an die API
+CACHE_ONLY_PREFIX = 'cache-only-'
+
+
+def batch_source_key(source_name, edition_date):
+    """Schlüssel eines Job-Eintrags: eine Ausgabe (Quelle und Datum), im Backfill gibt es mehrere pro Quelle"""
+    return f"{source_name}|{edition_date}"
+
+
+def job_entries(job):
+    """(Quelle, Eintrag) aller Ausgaben eines Jobs; ältere Zustände waren nur nach Quelle geschlüsselt"""
+    return [(entry.get('source_name', key), entry) for key, entry in job['sources'].items()]
+
+
+class GeminiBatchBackend:
+    """Gemini Batch API (google-genai) mit Inline-Requests; Antworten kommen in Eingabereihenfolge zurück"""
+
+    _STATES = {
+        'JOB_STATE_SUCCEEDED': SUCCEEDED,
+        'JOB_STATE_FAILED': FAILED,
+        'JOB_STATE_CANCELLED': FAILED,
+        'JOB_STATE_EXPIRED': FAILED,
+    }
+
+    def __init__(self, api_key, generation_config=None):
+        from google import genai  # optional, nur für den Batch-Modus nötig
+        self.client = genai.Client(api_key=api_key)
+        self.generation_config = generation_config or {}
+
+    def submit(self, model_name, requests, display_name):
+        inlined = [
+            {
+                'contents': [{'role': 'user', 'parts': [{'text': prompt}]}],
+                'metadata': {'key': key},
+                'config': self.generation_config,
+            }
+            for key, prompt in requests
+        ]
+        job = self.client.batches.create(model=model_name, src=inlined, config={'display_name': display_name})
+        return job.name
+
+    def poll(self, job_name, request_keys=None):
+        """Status und {Chunk-Schlüssel: Antwort}; ohne Metadaten gilt die Position in request_keys"""
+        job = self.client.batches.get(name=job_name)
+        state = self._STATES.get(getattr(job.state, 'name', str(job.state)), PENDING)
+        if state != SUCCEEDED:
+            return state, None
+
+        results = {}
+        for index, item in enumerate(job.dest.inlined_responses or []):
+            metadata = getattr(item, 'metadata', None) or {}
+            key = metadata.get('key')
+            if key is None:
+                if not request_keys or index >= len(request_keys):
+                    logging.warning(f"⚠️ Batch-Antwort {index} ohne Schlüssel - verworfen")
+                    continue
+                key = request_keys[index]
+            if getattr(item, 'error', None) or item.response is None:
+                results[key] = None
+            else:
+                results[key] = item.response.text
+        return SUCCEEDED, results
+
+
+class BatchJobStore:
+    """Lokaler Zustand der eingereichten Batch-Jobs, damit ein späterer Lauf die Ergebnisse abholt"""
+
+    def __init__(self, state_dir):
+        self.state_dir = state_dir
+        self.state_path = os.path.join(state_dir, 'batch_jobs.json')
+        self.lock = threading.Lock()
+        self.jobs = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.state_path)
+
+    def text_path(self, source_name, edition_date):
+        slug = re.sub(r'[^a-z0-9]+', '_', source_name.lower()).strip('_')
+        return os.path.join(self.state_dir, f"{slug}_{edition_date}.txt")
+
+    def store_text(self, source_name, edition_date, text):
+        """Sichert den Volltext bis zur Speicherung nach Abschluss des Jobs"""
+        os.makedirs(self.state_dir, exist_ok=True)
+        path = self.text_path(source_name, edition_date)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def add_job(self, job_name, model_name, sources, request_keys=()):
+        """sources: {Quelle|Datum: {'source_name', 'edition_date', 'text_path', 'chunks': [{'key', 'result'}]}},
+        request_keys: Chunk-Schlüssel in Einreichungsreihenfolge (Zuordnung der Antworten per Position)"""
+        with self.lock:
+            self.jobs.append({
+                'job_name': job_name,
+                'model': model_name,
+                'created_at': datetime.now().isoformat(),
+                'status': PENDING,
+                'sources': sources,
+                'request_keys': list(request_keys),
+            })
+            self._save()
+
+    def has_pending(self, source_name, edition_date):
+        with self.lock:
+            return any(
+                name == source_name and entry['edition_date'] == edition_date
+                for job in self.jobs if job['status'] == PENDING
+                for name, entry in job_entries(job)
+            )
+
+    def pending_jobs(self):
+        with self.lock:
+            return [job for job in self.jobs if job['status'] == PENDING]
+
+    def update(self, job_name, **fields):
+        with self.lock:
+            for job in self.jobs:
+                if job['job_name'] == job_name:
+                    job.update(fields)
+            self._save()
+
+    def mark_saved(self, entry):
+        """Merkt eine gespeicherte Ausgabe eines Jobs, damit ein erneuter Versuch sie nicht doppelt speichert"""
+        with self.lock:
+            entry['saved'] = True
+            self._save()
+
+    def cleanup(self, job):
+        """Entfernt gesicherte Texte eines abgeschlossenen Jobs"""
+        for source in job['sources'].values():
+            try:
+                os.remove(source['text_path'])
+            except OSError:
+                pass
+
+
+class BatchCollector:
+    """Sammelt die Chunk-Prompts aller Batch-Quellen eines Laufs für einen einzigen Job"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.sources = {}
+
+    def add_source(self, source_name, edition_date, text_path, chunks):
+        """chunks: Liste von (key, prompt oder None, gecachtes Ergebnis oder None)"""
+        with self.lock:
+            self.sources[batch_source_key(source_name, edition_date)] = {
+                'source_name': source_name,
+                'edition_date': edition_date,
+                'text_path': text_path,
+                'chunks': [{'key': key, 'result': cached} for key, _, cached in chunks],
+            }
+            self.requests.extend((key, prompt) for key, prompt, cached in chunks if cached is None)
+
+    def submit(self, get_backend, store, model_name):
+        """Reicht alle gesammelten Requests als einen Job ein; der Client wird nur bei echten Requests erzeugt"""
+        if not self.sources:
+            return None
+
+        job_name = None
+        if self.requests:
+            display_name = f"zeitungsanalyse-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+            job_name = get_backend().submit(model_name, self.requests, display_name)
+            logging.info(f"📨 Batch-Job eingereicht: {job_name} ({len(self.requests)} Chunks, {len(self.sources)} Quellen)")
+        else:
+            job_name = f"{CACHE_ONLY_PREFIX}{int(time.time())}"
+            logging.info("💾 Alle Batch-Chunks aus dem Cache - kein Job nötig")
+
+        store.add_job(job_name, model_name, self.sources, [key for key, _ in self.requests])
+        return job_name
@@ -0,0 +1,583 @@
+# benchmark_pipeline.py - Offline-Benchmark der Zeitungsanalyse mit lokalen Stand-ins
+#
+# Startet einen lokalen PDF-Server, ein Fake-Gemini-Modell (Latenz, 429-Rate) und ein
+# In-Memory-Supabase und misst die Pipeline ohne Netzwerk und ohne API-Keys.
+#
+#   python benchmark_pipeline.py --sources 3 --pages 60 --latency 0.5 --rate-429 0.05
+#   python benchmark_pipeline.py --output bench.json --baseline bench_alt.json
+#   python benchmark_pipeline.py --import-budget 0.3 --check-only-budget 0.5   (Kaltstart, Exit-Code 1)
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import random
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+WORDS = [
+    'Stadtrat', 'Haushalt', 'Schule', 'Radweg', 'Bürgermeister', 'Gewerbegebiet', 'Digitalisierung',
+    'Breitband', 'Jugendzentrum', 'Kreistag', 'Investition', 'Sanierung', 'Verkehr', 'Straßenbahn',
+    'Klimaschutz', 'Ehrenamt', 'Verein', 'Konzert', 'Fußball', 'Wetter', 'Anzeige', 'Halle', 'Magdeburg',
+    'Einwohner', 'Beschluss', 'Antrag', 'Fraktion', 'Förderung', 'Millionen', 'Euro', 'Baustelle',
+]
+# Jede vierte Seite ist Anzeigen/Wetter/Traueranzeigen - Futter für den lokalen Relevanzfilter
+FILLER_WORDS = [
+    'Anzeige', 'Angebot', 'Rabatt', 'Preis', 'Euro', 'Wetter', 'sonnig', 'bewölkt', 'Grad', 'Traueranzeige',
+    'verstorben', 'Beisetzung', 'Kleinanzeigen', 'Immobilien', 'Horoskop', 'Sudoku',
+]
+CATEGORIES = ['Kommunalpolitik', 'Wirtschaft & Gewerbe', 'Bildung', 'Verkehr & Infrastruktur',
+              'Digitalisierung & Innovation', 'Jugendthemen', 'Kultur & Events', 'Sport']
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_newspaper_pdf(pages=40, lines_per_page=60, seed=0):
+    """Erzeugt ein synthetisches, mehrseitiges Zeitungs-PDF (reines PDF 1.4, Helvetica)"""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", b""]
+    page_ids = []
+
+    for page_num in range(1, pages + 1):
+        words = FILLER_WORDS if page_num % 4 == 0 else WORDS
+        lines = [f"Lokales Seite {page_num}: {' '.join(rng.choice(words) for _ in range(5))}"]
+        lines += [' '.join(rng.choice(words).lower() for _ in range(12)) for _ in range(lines_per_page - 1)]
+        stream = "BT /F1 9 Tf 36 806 Td 12 TL " + ' '.join(f"({_pdf_escape(line)}) '" for line in lines) + " ET"
+        data = stream.encode('latin-1', 'replace')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 1 0 R >> >> >>" % content_id
+        )
+        page_ids.append(len(objects))
+
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b' '.join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, len(objects), xref)
+    return bytes(out)
+
+
+class PdfServer:
+    """Lokaler HTTP-Server für die Test-PDFs (mit ETag und Range-Unterstützung)"""
+
+    def __init__(self, files):
+        self.files = files
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                body = server.files.get(self.path.lstrip('/'))
+                if body is None:
+                    # App-Health-Check und unbekannte Pfade
+                    self.send_response(200 if self.path == '/' else 404)
+                    self.end_headers()
+                    return
+
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                if self.headers.get('If-None-Match') == etag and not self.headers.get('Range'):
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+
+                start = 0
+                match = re.match(r'bytes=(\d+)-', self.headers.get('Range', ''))
+                if match and self.headers.get('If-Range') == etag:
+                    start = int(match.group(1))
+                    self.send_response(206)
+                    self.send_header('Content-Range', f"bytes {start}-{len(body) - 1}/{len(body)}")
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'application/pdf')
+                self.send_header('Content-Length', str(len(body) - start))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(body[start:])
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+
+class ResourceExhausted(Exception):
+    """Stand-in für google.api_core.exceptions.ResourceExhausted (429)"""
+
+
+class _FakeResponse:
+    def __init__(self, text, prompt_tokens, output_tokens):
+        self.text = text
+        self.usage_metadata = type('Usage', (), {
+            'prompt_token_count': prompt_tokens,
+            'candidates_token_count': output_tokens,
+            'total_token_count': prompt_tokens + output_tokens,
+        })()
+
+
+class FakeGeminiModel:
+    """Fake-Modell: antwortet je Seitenmarker mit einem Artikel, mit Latenz und zufälligen 429"""
+
+    def __init__(self, latency=0.5, rate_429=0.0, seed=0):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.rate_limited = 0
+        self.token_counts = 0
+
+    def count_tokens(self, text):
+        with self.lock:
+            self.token_counts += 1
+        return type('Count', (), {'total_tokens': len(text) // 4 + 1})()
+
+    def generate_content(self, prompt):
+        with self.lock:
+            self.calls += 1
+            throttled = self.rng.random() < self.rate_429
+            if throttled:
+                self.rate_limited += 1
+        time.sleep(self.latency)
+        if throttled:
+            raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+
+        pages = re.findall(r'=== SEITE (\d+) ===\n([^\n]*)', prompt)
+        articles = [
+            {
+                'category': CATEGORIES[(int(page) + len(headline)) % len(CATEGORIES)],
+                'title': headline.split(': ', 1)[-1].title(),
+                'summary': f"Bericht von Seite {page} über {headline.split(': ', 1)[-1]}.",
+                'page': page,
+                'relevance': 'Betrifft die lokale Politik und junge Menschen in der Region.',
+            }
+            for page, headline in pages
+        ]
+
+        if 'FORMAT: JSON-Liste' in prompt:
+            text = json.dumps(articles, ensure_ascii=False)
+        else:
+            text = '\n'.join(
+                f"**{a['category']} - {a['title']}**\n📍 {a['summary']}\n📄 Seite: {a['page']}\n"
+                f"🎯 JuLi-Relevanz: {a['relevance']}\n---"
+                for a in articles
+            )
+        return _FakeResponse(text, len(prompt) // 4, len(text) // 4)
+
+
+class FakeBatchBackend:
+    """Fake-Batch-API: beantwortet alle Requests eines Jobs mit dem Fake-Modell beim ersten Abfragen"""
+
+    def __init__(self, model):
+        self.model = model
+        self.jobs = {}
+        self.requests = 0
+
+    def submit(self, model_name, requests, display_name):
+        job_name = f"batches/{display_name}-{len(self.jobs)}"
+        self.jobs[job_name] = list(requests)
+        self.requests += len(requests)
+        return job_name
+
+    def poll(self, job_name, request_keys=None):
+        results = {key: self.model.generate_content(prompt).text for key, prompt in self.jobs.pop(job_name, [])}
+        return 'succeeded', results
+
+
+class _FakeResult:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+class _FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table = table
+        self.action = 'select'
+        self.payload = None
+        self.filters = []
+        self.count = None
+
+    def insert(self, payload):
+        self.action, self.payload = 'insert', payload
+        return self
+
+    def delete(self):
+        self.action = 'delete'
+        return self
+
+    def select(self, *columns, count=None):
+        self.action, self.count = 'select', count
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: str(row.get(column, '')) >= str(value))
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: str(row.get(column, '')) <= str(value))
+        return self
+
+    def limit(self, n):
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def execute(self):
+        return self.db.execute(self)
+
+
+class FakeSupabase:
+    """In-Memory-Ersatz für den Supabase-Client (insert/select/delete/rpc)"""
+
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.tables = defaultdict(list)
+        self.ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.round_trips = 0
+        self.rows_written = 0
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        db = self
+
+        class _Rpc:
+            def execute(self):
+                return db.call_rpc(name, params)
+        return _Rpc()
+
+    def _insert(self, table, rows):
+        inserted = []
+        for row in rows:
+            row = dict(row, id=next(self.ids), created_at=time.strftime('%Y-%m-%dT%H:%M:%S'))
+            self.tables[table].append(row)
+            inserted.append(row)
+        self.rows_written += len(inserted)
+        return inserted
+
+    def execute(self, query):
+        time.sleep(self.latency)
+        with self.lock:
+            self.round_trips += 1
+            rows = self.tables[query.table]
+            if query.action == 'insert':
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                return _FakeResult(self._insert(query.table, payload))
+            matching = [row for row in rows if all(f(row) for f in query.filters)]
+            if query.action == 'delete':
+                self.tables[query.table] = [row for row in rows if row not in matching]
+            return _FakeResult(matching, len(matching) if query.count else None)
+
+    def call_rpc(self, name, params):
+        time.sleep(self.latency)
+        with self.lock:
+            self.round_trips += 1
+            if name != 'save_analysis_with_articles':
+                raise Exception(f"Could not find the function public.{name}")
+            analysis_id = self._insert('analyses', [params['analysis']])[0]['id']
+            self._insert('articles', [dict(row, analysis_id=analysis_id) for row in params['articles']])
+            return _FakeResult(analysis_id)
+
+
+class StageTimer:
+    """Summiert die Zeit pro Stufe über alle Threads"""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self.lock:
+            self.totals[stage] += seconds
+            self.counts[stage] += 1
+
+    def wrap(self, obj, method_name, stage):
+        method = getattr(obj, method_name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        setattr(obj, method_name, timed)
+
+    def measure(self, stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        self.add(stage, time.perf_counter() - start)
+        return result
+
+
+def peak_rss_mb():
+    """Spitzen-RSS in MB (eigener Prozess und beendete Kindprozesse, Linux: KB)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(max(own, children) / scale, 1)
+
+
+# Kalter Start in einem frischen Prozess: Import, Konstruktor und der schnelle Pfad ohne offene Ausgaben
+STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import auto_analyzer
+imported = time.perf_counter()
+analyzer = auto_analyzer.AutoNewspaperAnalyzer()
+analyzer.newspaper_sources = [{'name': f"Bench Quelle {i}", 'enabled': True} for i in range(int(sys.argv[1]))]
+pending = analyzer.check_only(remote=False)
+done = time.perf_counter()
+print(json.dumps({
+    'import_seconds': round(imported - start, 3),
+    'check_only_seconds': round(done - start, 3),
+    'pending': pending,
+    'heavy_modules': [m for m in ('google.generativeai', 'supabase', 'pypdf', 'requests') if m in sys.modules],
+}))
+"""
+
+
+def measure_startup(sources, repeats=3):
+    """Bester von `repeats` Kaltstarts (Umgebung wie im Benchmark, Checkpoints des Laufs liegen vor)"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c', STARTUP_PROBE, str(sources)],
+            cwd=here, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run['check_only_seconds'])
+
+
+def check_startup_budget(startup, import_budget, check_only_budget):
+    """Meldet Überschreitungen des Start-Budgets und schwere Importe auf dem schnellen Pfad"""
+    violations = []
+    if startup['import_seconds'] > import_budget:
+        violations.append(f"import auto_analyzer: {startup['import_seconds']:.3f}s > {import_budget:.3f}s")
+    if startup['pending'] == 0 and startup['check_only_seconds'] > check_only_budget:
+        violations.append(f"--check-only: {startup['check_only_seconds']:.3f}s > {check_only_budget:.3f}s")
+    if startup['heavy_modules']:
+        violations.append(f"schwere Module beim Start geladen: {', '.join(startup['heavy_modules'])}")
+    return violations
+
+
+def configure_environment(work_dir, args):
+    """Richtet die Umgebung so ein, dass nichts außerhalb von work_dir landet"""
+    os.environ.update({
+        'GEMINI_CACHE_DIR': os.path.join(work_dir, 'gemini'),
+        'GEMINI_CACHE_DISABLED': 'true',
+        'PDF_DOWNLOAD_DIR': os.path.join(work_dir, 'pdf'),
+        'DEDUP_INDEX_PATH': os.path.join(work_dir, 'dedup_index.json'),
+        'PAGE_DIFF_STORE_PATH': os.path.join(work_dir, 'page_fingerprints.json'),
+        'HOST_DELAY_SECONDS': '0',
+        'GEMINI_REQUESTS_PER_MINUTE': str(args.rpm),
+        'GEMINI_MAX_WORKERS': str(args.gemini_workers),
+        'SOURCE_CONCURRENCY': str(args.source_concurrency),
+        'GEMINI_STRUCTURED_OUTPUT': 'false' if args.legacy else 'true',
+        'BATCH_STATE_DIR': os.path.join(work_dir, 'batch'),
+        'CHECKPOINT_DIR': os.path.join(work_dir, 'checkpoints'),
+        'RELEVANCE_MODEL_PATH': os.path.join(work_dir, 'relevance_model.json'),
+        'SEARCH_INDEX_PATH': os.path.join(work_dir, 'search_index.sqlite'),
+        'STATS_ROLLUP_PATH': os.path.join(work_dir, 'stats_rollup.sqlite'),
+        'OCR_CACHE_DIR': os.path.join(work_dir, 'ocr'),
+        'ANALYTICS_EXPORT_DIR': os.path.join(work_dir, 'analytics'),
+        'RELEVANCE_AUDIT_LOG': os.path.join(work_dir, 'relevance_audit.jsonl'),
+        'RELEVANCE_FILTER_ENABLED': 'false' if args.no_prefilter else 'true',
+        'ANALYSIS_MODE': 'batch' if args.batch else 'interactive',
+        'GEMINI_DETAIL_MODEL': args.detail_model or '',
+        'GEMINI_DETAIL_REQUESTS_PER_MINUTE': str(args.rpm),
+        'GEMINI_DETAIL_TOKENS_PER_MINUTE': '1000000',
+        'GEMINI_DETAIL_MAX_WORKERS': str(args.detail_workers),
+    })
+
+
+def run_benchmark(args):
+    work_dir = tempfile.mkdtemp(prefix='zeitung_bench_')
+    configure_environment(work_dir, args)
+
+    import logging
+    import auto_analyzer
+    from chunking import split_pages
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    timer = StageTimer()
+    pdfs = {f"quelle_{i}.pdf": make_newspaper_pdf(args.pages, args.lines, seed=i) for i in range(args.sources)}
+    server = PdfServer(pdfs)
+    model = FakeGeminiModel(args.latency, args.rate_429)
+    database = FakeSupabase(args.db_latency)
+
+    try:
+        # Fehlende Keys sind hier gewollt - Stand-ins werden direkt gesetzt
+        logging.disable(logging.ERROR)
+        analyzer = auto_analyzer.AutoNewspaperAnalyzer()
+        logging.disable(logging.NOTSET)
+        analyzer.gemini_model = model
+        detail_model = FakeGeminiModel(args.latency * args.detail_latency_factor, args.rate_429, seed=1)
+        if analyzer.detail_tier:
+            analyzer.detail_tier.model = detail_model
+        analyzer.supabase = database
+        analyzer.batch_backend = batch_backend = FakeBatchBackend(model)
+        analyzer.app_url = server.url + '/'
+        analyzer.newspaper_sources = [
+            {'name': f"Bench Quelle {i}", 'pdf_url': f"{server.url}/quelle_{i}.pdf", 'enabled': True}
+            for i in range(args.sources)
+        ]
+
+        for method_name, stage in (('download_pdf', 'download'), ('analyze_chunk', 'gemini'),
+                                   ('parse_articles_from_analysis', 'parsing'), ('save_to_database', 'persistence')):
+            timer.wrap(analyzer, method_name, stage)
+
+        # End-to-End (Extraktion und Chunking laufen hier im Seitenstrom mit)
+        start = time.perf_counter()
+        success = analyzer.run_daily_analysis()
+        wall_seconds = time.perf_counter() - start
+
+        # Isolierte Messung der CPU-Stufen auf einer Ausgabe
+        pdf_path = analyzer.pdf_downloader.download('Isoliert', f"{server.url}/quelle_0.pdf")[0]
+        text = timer.measure('extraction', analyzer.extract_pdf_text, pdf_path)
+        chunks = timer.measure('chunking', lambda t: list(analyzer.chunker.iter_chunks(split_pages(t))), text)
+        startup = measure_startup(args.sources)
+
+        report = {
+            'config': vars(args),
+            'success': success,
+            'wall_seconds': round(wall_seconds, 3),
+            'stage_seconds': {stage: round(seconds, 3) for stage, seconds in sorted(timer.totals.items())},
+            'stage_calls': dict(timer.counts),
+            'peak_rss_mb': peak_rss_mb(),
+            'pdf_bytes_per_source': len(pdfs['quelle_0.pdf']),
+            'chunks_per_source': len(chunks),
+            'api_calls': {
+                'generate_content': model.calls,
+                'rate_limited': model.rate_limited,
+                'count_tokens': model.token_counts,
+                'batch_requests': batch_backend.requests,
+                'detail_generate_content': detail_model.calls,
+            },
+            'http_requests': server.requests,
+            'db': {
+                'round_trips': database.round_trips,
+                'rows_written': database.rows_written,
+                'articles': len(database.tables['articles']),
+            },
+            'startup': startup,
+            'run_report': analyzer.metrics.report(),
+        }
+        return report
+    finally:
+        server.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def compare_with_baseline(report, baseline, tolerance):
+    """Meldet Stufen, die mehr als `tolerance` langsamer sind als die Baseline"""
+    regressions = []
+    for stage, seconds in report['stage_seconds'].items():
+        before = baseline.get('stage_seconds', {}).get(stage)
+        if before and seconds > before * (1 + tolerance) and seconds - before > 0.05:
+            regressions.append(f"{stage}: {before:.3f}s -> {seconds:.3f}s")
+    before_calls = baseline.get('api_calls', {}).get('generate_content')
+    if before_calls and report['api_calls']['generate_content'] > before_calls * (1 + tolerance):
+        regressions.append(f"generate_content: {before_calls} -> {report['api_calls']['generate_content']} Aufrufe")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Offline-Benchmark der automatischen Zeitungsanalyse')
+    parser.add_argument('--sources', type=int, default=2, help='Anzahl Zeitungsquellen')
+    parser.add_argument('--pages', type=int, default=40, help='Seiten pro Ausgabe')
+    parser.add_argument('--lines', type=int, default=60, help='Zeilen pro Seite')
+    parser.add_argument('--latency', type=float, default=0.3, help='Fake-Gemini-Latenz pro Anfrage (s)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Anteil der Anfragen mit 429')
+    parser.add_argument('--db-latency', type=float, default=0.02, help='Latenz pro Supabase-Round-Trip (s)')
+    parser.add_argument('--rpm', type=int, default=600, help='Gemini-Anfragen pro Minute')
+    parser.add_argument('--gemini-workers', type=int, default=4)
+    parser.add_argument('--source-concurrency', type=int, default=4)
+    parser.add_argument('--legacy', action='store_true', help='Emoji-Textformat statt JSON')
+    parser.add_argument('--no-prefilter', action='store_true', help='Lokalen Relevanzfilter abschalten')
+    parser.add_argument('--batch', action='store_true', help='Analyse über die (Fake-)Batch-API')
+    parser.add_argument('--detail-model', help='Detailstufe für Chunks mit höchste/hohe (z.B. gemini-1.5-pro)')
+    parser.add_argument('--detail-workers', type=int, default=2)
+    parser.add_argument('--detail-latency-factor', type=float, default=3.0,
+                        help='Latenz der Detailstufe relativ zu --latency')
+    parser.add_argument('--output', help='Bericht als JSON speichern')
+    parser.add_argument('--baseline', help='Vergleich mit früherem Bericht (Exit-Code 1 bei Regression)')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Erlaubte Verschlechterung (0.2 = 20%%)')
+    parser.add_argument('--import-budget', type=float, default=0.3, help='Erlaubte Importzeit von auto_analyzer (s)')
+    parser.add_argument('--check-only-budget', type=float, default=0.5,
+                        help='Erlaubte Dauer des schnellen Pfads ohne offene Ausgaben (s, inkl. Import)')
+    parser.add_argument('--verbose', action='store_true')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = run_benchmark(args)
+
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    violations = check_startup_budget(report['startup'], args.import_budget, args.check_only_budget)
+    if violations:
+        print("❌ Start-Budget überschritten:")
+        for line in violations:
+            print(f"   {line}")
+        return 1
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_with_baseline(report, json.load(f), args.tolerance)
+        if regressions:
+            print("❌ Regressionen gegenüber Baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ Keine Regression gegenüber Baseline")
+
+    return 0 if report['success'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
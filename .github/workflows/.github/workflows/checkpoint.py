@@ -0,0 +1,148 @@
+# checkpoint.py - Fortsetzbare Verarbeitung pro Quelle und Ausgabe (Download, Seiten, Chunks, Speicherung)
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+from pdf_downloader import PdfDownloader
+
+
+def _write_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+class SourceCheckpoint:
+    """Fortschritt einer Ausgabe: PDF-Hash, extrahierte Seiten, Gemini-Ergebnis je Chunk, Speicher-Flag"""
+
+    def __init__(self, path, source_name, edition_date):
+        self.path = path
+        self.source_name = source_name
+        self.edition_date = edition_date
+        self.state_path = os.path.join(path, 'state.json')
+        self.pages_path = os.path.join(path, 'pages.json')
+        self.chunks_dir = os.path.join(path, 'chunks')
+        self.lock = threading.Lock()
+        self.state = self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        os.makedirs(self.path, exist_ok=True)
+        self.state['updated_at'] = time.time()
+        _write_atomic(self.state_path, json.dumps(self.state, ensure_ascii=False))
+
+    @property
+    def persisted(self):
+        return bool(self.state.get('persisted'))
+
+    @property
+    def extracted(self):
+        return bool(self.state.get('extracted')) and os.path.exists(self.pages_path)
+
+    def record_download(self, pdf_path):
+        with self.lock:
+            self.state['pdf'] = {'path': pdf_path, 'sha256': PdfDownloader.file_sha256(pdf_path)}
+            self._save()
+
+    def downloaded_pdf(self):
+        """Pfad des bereits geladenen PDFs, falls die Datei noch unverändert vorliegt"""
+        pdf = self.state.get('pdf')
+        if not pdf or not os.path.exists(pdf['path']):
+            return None
+        if PdfDownloader.file_sha256(pdf['path']) != pdf['sha256']:
+            return None
+        return pdf['path']
+
+    def store_pages(self, pages):
+        """Sichert alle extrahierten Seiten als [(Seitennummer, Text)]"""
+        with self.lock:
+            os.makedirs(self.path, exist_ok=True)
+            _write_atomic(self.pages_path, json.dumps(pages, ensure_ascii=False))
+            self.state['extracted'] = True
+            self._save()
+
+    def extracted_pages(self):
+        if not self.extracted:
+            return None
+        try:
+            with open(self.pages_path, 'r', encoding='utf-8') as f:
+                return [(page_num, page_text) for page_num, page_text in json.load(f)]
+        except (OSError, ValueError):
+            return None
+
+    def chunk_result(self, key):
+        try:
+            with open(os.path.join(self.chunks_dir, f"{key}.txt"), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def store_chunk(self, key, result):
+        os.makedirs(self.chunks_dir, exist_ok=True)
+        _write_atomic(os.path.join(self.chunks_dir, f"{key}.txt"), result)
+
+    def mark_persisted(self, analysis_id):
+        """Nach dem Speichern werden Seiten und Chunk-Ergebnisse nicht mehr gebraucht"""
+        with self.lock:
+            self.state.update({'persisted': True, 'analysis_id': analysis_id})
+            self._save()
+        shutil.rmtree(self.chunks_dir, ignore_errors=True)
+        try:
+            os.remove(self.pages_path)
+        except OSError:
+            pass
+
+
+class CheckpointStore:
+    """Legt pro (Quelle, Ausgabe) ein Checkpoint-Verzeichnis an und räumt alte Verzeichnisse auf"""
+
+    def __init__(self, checkpoint_dir, max_age_days=3, enabled=True):
+        self.checkpoint_dir = checkpoint_dir
+        self.max_age_seconds = max_age_days * 86400
+        self.enabled = enabled
+
+    def _path(self, source_name, edition_date):
+        slug = re.sub(r'[^a-z0-9]+', '_', source_name.lower()).strip('_')
+        return os.path.join(self.checkpoint_dir, f"{slug}_{edition_date}")
+
+    def open(self, source_name, edition_date):
+        if not self.enabled:
+            return None
+        checkpoint = SourceCheckpoint(self._path(source_name, edition_date), source_name, edition_date)
+        if checkpoint.state and not checkpoint.persisted:
+            logging.info(f"♻️ Checkpoint gefunden für {source_name} ({edition_date}) - setze fort")
+        return checkpoint
+
+    def is_persisted(self, source_name, edition_date):
+        """Nur lesend: wurde die Ausgabe laut Checkpoint bereits gespeichert?"""
+        if not self.enabled:
+            return False
+        return SourceCheckpoint(self._path(source_name, edition_date), source_name, edition_date).persisted
+
+    def prune(self):
+        """Entfernt Checkpoints, die älter als max_age_days sind"""
+        if not self.enabled or not os.path.isdir(self.checkpoint_dir):
+            return 0
+
+        removed = 0
+        cutoff = time.time() - self.max_age_seconds
+        for name in os.listdir(self.checkpoint_dir):
+            path = os.path.join(self.checkpoint_dir, name)
+            if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+
+        if removed:
+            logging.info(f"🧹 {removed} alte Checkpoints entfernt")
+        return removed
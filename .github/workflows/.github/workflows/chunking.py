@@ -0,0 +1,134 @@
+# chunking.py - Token-basiertes Chunking ganzer Seiten für Gemini
+import logging
+import re
+
+from pdf_pages import format_page
+
+# Kontextfenster (Input-Tokens) der unterstützten Modelle
+MODEL_CONTEXT_TOKENS = {
+    'gemini-1.5-flash': 1048576,
+    'gemini-1.5-flash-8b': 1048576,
+    'gemini-1.5-pro': 2097152,
+    'gemini-2.0-flash': 1048576,
+}
+
+_PAGE_MARKER = re.compile(r'^=== SEITE (\d+)(?: \(Fortsetzung\))? ===\n', re.MULTILINE)
+
+
+def estimate_tokens(text, chars_per_token=4.0):
+    """Schnelle lokale Schätzung ohne API-Aufruf"""
+    return int(len(text) / chars_per_token) + 1
+
+
+def chunk_pages(chunk):
+    """Seitennummern, deren Text (ganz oder teilweise) in einem Chunk steckt"""
+    return {int(match.group(1)) for match in _PAGE_MARKER.finditer(chunk)}
+
+
+def split_pages(text):
+    """Zerlegt bereits formatierten Text wieder in (Seitennummer, Text) anhand der Seitenmarker"""
+    markers = list(_PAGE_MARKER.finditer(text))
+    if not markers:
+        if text.strip():
+            yield None, text
+        return
+
+    for marker, next_marker in zip(markers, markers[1:] + [None]):
+        end = next_marker.start() if next_marker else len(text)
+        yield int(marker.group(1)), text[marker.end():end].rstrip('\n')
+
+
+class TokenCounter:
+    """Zählt Tokens lokal; mit Modell wird das Verhältnis Zeichen/Token einmal per count_tokens kalibriert"""
+
+    def __init__(self, model=None, chars_per_token=4.0, get_model=None):
+        # get_model: liefert das Modell erst bei der Kalibrierung (Client wird nicht vorab initialisiert)
+        self.model = model
+        self.get_model = get_model
+        self.chars_per_token = chars_per_token
+        self.calibrated = model is None and get_model is None
+
+    def count(self, text):
+        if not self.calibrated and len(text) > 1000:
+            self.calibrated = True
+            try:
+                model = self.model or self.get_model()
+                total = model.count_tokens(text).total_tokens
+                if total:
+                    self.chars_per_token = len(text) / total
+                    logging.info(f"🔢 Token-Verhältnis kalibriert: {self.chars_per_token:.2f} Zeichen/Token")
+            except Exception as e:
+                logging.warning(f"⚠️ count_tokens fehlgeschlagen, verwende Schätzung: {e}")
+        return estimate_tokens(text, self.chars_per_token)
+
+
+class TokenChunker:
+    """Packt ganze Seiten bis zum Token-Budget in einen Chunk; Seitenmarker bleiben erhalten"""
+
+    def __init__(self, token_budget, counter=None):
+        self.token_budget = token_budget
+        self.counter = counter or TokenCounter()
+
+    def _split_page(self, page_num, page_text):
+        """Teilt eine übergroße Seite an Absatzgrenzen, Folgeteile bekommen einen Fortsetzungsmarker"""
+        budget_chars = int(self.token_budget * self.counter.chars_per_token)
+        parts = []
+        current = []
+        current_len = 0
+
+        for paragraph in page_text.split('\n\n'):
+            if len(paragraph) > budget_chars:
+                # Erst die gesammelten Absätze abschließen, sonst landen die Stücke vor dem Seitenanfang
+                if current:
+                    parts.append('\n\n'.join(current))
+                    current, current_len = [], 0
+                while len(paragraph) > budget_chars:
+                    parts.append(paragraph[:budget_chars])
+                    paragraph = paragraph[budget_chars:]
+            if current and current_len + len(paragraph) > budget_chars:
+                parts.append('\n\n'.join(current))
+                current, current_len = [], 0
+            current.append(paragraph)
+            current_len += len(paragraph) + 2
+
+        if current:
+            parts.append('\n\n'.join(current))
+
+        for i, part in enumerate(parts):
+            if page_num is None:
+                yield part
+            elif i == 0:
+                yield format_page(page_num, part)
+            else:
+                yield f"=== SEITE {page_num} (Fortsetzung) ===\n{part}\n\n"
+
+    def iter_chunks(self, pages):
+        """Liefert Chunks, sobald das Budget voll ist - funktioniert direkt auf dem Seitenstrom"""
+        buffer = []
+        buffer_tokens = 0
+
+        for page_num, page_text in pages:
+            block = format_page(page_num, page_text) if page_num is not None else page_text
+            block_tokens = self.counter.count(block)
+
+            if block_tokens > self.token_budget:
+                blocks = [(part, self.counter.count(part)) for part in self._split_page(page_num, page_text)]
+            else:
+                blocks = [(block, block_tokens)]
+
+            for block, block_tokens in blocks:
+                if buffer and buffer_tokens + block_tokens > self.token_budget:
+                    yield ''.join(buffer).strip()
+                    buffer, buffer_tokens = [], 0
+                buffer.append(block)
+                buffer_tokens += block_tokens
+
+        chunk = ''.join(buffer).strip()
+        if chunk:
+            yield chunk
+
+
+def default_token_budget(model_name, prompt_tokens=600, output_reserve=8192):
+    """Budget, das ein Chunk maximal im Kontextfenster des Modells belegen darf"""
+    context = MODEL_CONTEXT_TOKENS.get(model_name, 32768)
+    return context - prompt_tokens - output_reserve
@@ -0,0 +1,194 @@
+# dedup.py - Artikel-Deduplizierung über Chunks, Ausgaben und Tage
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+
+PRIORITY_RANK = {'höchste': 0, 'hohe': 1, 'standard': 2}
+
+_UMLAUTS = str.maketrans({'ä': 'ae', 'ö': 'oe', 'ü': 'ue', 'ß': 'ss'})
+
+
+def normalize_text(text):
+    """Kleinschreibung, Umlaute ausgeschrieben, nur Buchstaben/Ziffern"""
+    text = (text or '').lower().translate(_UMLAUTS)
+    return ' '.join(re.findall(r'[a-z0-9]+', text))
+
+
+def title_fingerprint(title):
+    """Fingerprint der normalisierten Überschrift"""
+    return hashlib.sha1(normalize_text(title).encode('utf-8')).hexdigest()[:16]
+
+
+def simhash(text, bits=64):
+    """SimHash über Wort-Bigramme - ähnliche Texte haben kleine Hamming-Distanz"""
+    words = normalize_text(text).split()
+    features = [' '.join(words[i:i + 2]) for i in range(len(words) - 1)] or words
+    if not features:
+        return 0
+
+    weights = [0] * bits
+    for feature in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    return sum(1 << bit for bit in range(bits) if weights[bit] > 0)
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def days_apart(date_a, date_b):
+    """Abstand zweier Ausgabedaten (YYYY-MM-DD) in Tagen"""
+    return abs((datetime.strptime(date_a, '%Y-%m-%d') - datetime.strptime(date_b, '%Y-%m-%d')).days)
+
+
+class ArticleDeduplicator:
+    """Fasst Beinahe-Duplikate zusammen und merkt sich Artikel der letzten Tage in einem lokalen Index"""
+
+    def __init__(self, index_path, window_days=7, max_distance=3, skip_seen_chunks=False):
+        self.index_path = index_path
+        self.window_days = window_days
+        self.max_distance = max_distance
+        self.skip_seen_chunks = skip_seen_chunks
+        self.lock = threading.Lock()
+        self.index = self._load()
+        # Ausgaben dieses Laufs - ihr Zeitfenster bleibt beim Aufräumen erhalten (Backfill älterer Daten)
+        self.edition_dates = set()
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+        index.setdefault('articles', [])
+        index.setdefault('chunks', {})
+        return index
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.index_path) or '.', exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _is_duplicate(self, fingerprint, summary_hash, other_fingerprint, other_hash):
+        if fingerprint == other_fingerprint:
+            return True
+        return bool(summary_hash and other_hash) and hamming_distance(summary_hash, other_hash) <= self.max_distance
+
+    @staticmethod
+    def _merge(kept, duplicate):
+        """Behält die höhere Priorität und die ausführlicheren Texte"""
+        if PRIORITY_RANK.get(duplicate['priority'], 2) < PRIORITY_RANK.get(kept['priority'], 2):
+            kept['priority'] = duplicate['priority']
+            kept['category'] = duplicate['category']
+        for field in ('summary', 'relevance'):
+            if len(duplicate.get(field, '')) > len(kept.get(field, '')):
+                kept[field] = duplicate[field]
+        pages = [p for p in (kept['page'], duplicate['page']) if p and p != 'nicht erkennbar']
+        if pages:
+            kept['page'] = ', '.join(dict.fromkeys(', '.join(pages).split(', ')))
+
+    def merge_duplicates(self, articles):
+        """Fasst Artikel zusammen, die innerhalb eines Laufs mehrfach erkannt wurden (z.B. an Chunk-Grenzen)"""
+        merged = []
+        keys = []
+
+        for article in articles:
+            fingerprint = title_fingerprint(article['title'])
+            summary_hash = simhash(article['summary'])
+
+            for kept, (kept_fingerprint, kept_hash) in zip(merged, keys):
+                if self._is_duplicate(fingerprint, summary_hash, kept_fingerprint, kept_hash):
+                    self._merge(kept, article)
+                    break
+            else:
+                merged.append(dict(article))
+                keys.append((fingerprint, summary_hash))
+
+        if len(merged) < len(articles):
+            logging.info(f"🔗 {len(articles) - len(merged)} doppelte Artikel zusammengeführt")
+        return merged
+
+    def _entry(self, article, source_name, edition_date):
+        return {
+            'fingerprint': title_fingerprint(article['title']),
+            'simhash': simhash(article['summary']),
+            'source': source_name,
+            'date': edition_date
+        }
+
+    def claim(self, articles, source_name, edition_date):
+        """Entfernt bereits bekannte Artikel und reserviert die übrigen für diese Ausgabe - in einem Schritt unter
+        dem Lock, damit parallel verarbeitete Quellen denselben Artikel nicht beide behalten.
+        Nach dem Speichern commit(), bei Fehlschlag release()"""
+        fresh = []
+        with self.lock:
+            self.edition_dates.add(edition_date)
+            others = [
+                entry for entry in self.index['articles']
+                if (entry['source'], entry['date']) != (source_name, edition_date)
+            ]
+            seen = [
+                (entry['fingerprint'], entry['simhash']) for entry in others
+                if days_apart(entry['date'], edition_date) <= self.window_days
+            ]
+            for article in articles:
+                entry = self._entry(article, source_name, edition_date)
+                if any(self._is_duplicate(entry['fingerprint'], entry['simhash'], fp, h) for fp, h in seen):
+                    logging.info(f"⏭️ Bereits bekannt: {article['title']}")
+                    continue
+                fresh.append(article)
+            self.index['articles'] = others + [self._entry(a, source_name, edition_date) for a in fresh]
+
+        if len(fresh) < len(articles):
+            logging.info(f"🔗 {len(articles) - len(fresh)} Artikel aus früheren Ausgaben übersprungen")
+        return fresh
+
+    def release(self, source_name, edition_date):
+        """Gibt die Reservierung einer nicht gespeicherten Ausgabe wieder frei"""
+        with self.lock:
+            self.index['articles'] = [
+                entry for entry in self.index['articles']
+                if (entry['source'], entry['date']) != (source_name, edition_date)
+            ]
+
+    @staticmethod
+    def chunk_hash(chunk):
+        return hashlib.sha1(normalize_text(chunk).encode('utf-8')).hexdigest()
+
+    def chunk_seen(self, chunk, source_name, edition_date):
+        """True, wenn derselbe Text schon für eine andere Ausgabe analysiert wurde"""
+        if not self.skip_seen_chunks:
+            return False
+        with self.lock:
+            owner = self.index['chunks'].get(self.chunk_hash(chunk))
+        return owner is not None and owner[:2] != [source_name, edition_date]
+
+    def remember_chunk(self, chunk, source_name, edition_date):
+        """Merkt sich einen analysierten Chunk (wird mit commit() gespeichert)"""
+        with self.lock:
+            self.index['chunks'].setdefault(self.chunk_hash(chunk), [source_name, edition_date])
+
+    def commit(self):
+        """Schreibt den Index nach dem Speichern einer Ausgabe auf die Platte"""
+        with self.lock:
+            self._prune()
+            self._save()
+
+    def _prune(self):
+        """Behält Einträge im Zeitfenster der neuesten Ausgabe im Index und der Ausgaben dieses Laufs"""
+        dates = {e['date'] for e in self.index['articles']} | {owner[1] for owner in self.index['chunks'].values()}
+        if not dates:
+            return
+        anchors = self.edition_dates | {max(dates)}
+        keep = {date for date in dates if any(days_apart(date, anchor) <= self.window_days for anchor in anchors)}
+        self.index['articles'] = [e for e in self.index['articles'] if e['date'] in keep]
+        self.index['chunks'] = {h: owner for h, owner in self.index['chunks'].items() if owner[1] in keep}
@@ -0,0 +1,100 @@
+# gemini_cache.py - Persistenter, inhaltsadressierter Cache für Gemini-Chunk-Ergebnisse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+
+class GeminiCache:
+    """Speichert Gemini-Antworten auf der Platte, Schlüssel = Hash aus Modell, Prompt-Version und Chunk"""
+
+    def __init__(self, cache_dir, max_age_days=30, max_size_mb=200, enabled=True):
+        self.cache_dir = cache_dir
+        self.max_age = max_age_days * 86400
+        self.max_size = max_size_mb * 1024 * 1024
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model_name, prompt_version, chunk):
+        """Erzeugt den Cache-Schlüssel für einen Chunk"""
+        payload = json.dumps([model_name, prompt_version, chunk], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Liefert das gespeicherte Ergebnis oder None"""
+        if not self.enabled:
+            return None
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # Alter zählt ab dem Schreiben - häufig gelesene Einträge laufen trotzdem ab
+            if time.time() - entry['created'] > self.max_age:
+                os.remove(path)
+                self.misses += 1
+                return None
+            # Nur die Zugriffszeit setzen (für die Größenverdrängung), die mtime bleibt Erstellzeit
+            os.utime(path, (time.time(), os.stat(path).st_mtime))
+            self.hits += 1
+            return entry['text']
+        except (OSError, ValueError, KeyError):
+            self.misses += 1
+            return None
+
+    def set(self, key, text):
+        """Speichert ein Ergebnis atomar"""
+        if not self.enabled:
+            return
+
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Chunk-Threads können denselben Schlüssel gleichzeitig schreiben -> Temp-Datei pro Thread
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'text': text, 'created': time.time()}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"⚠️ Cache-Eintrag konnte nicht gespeichert werden: {e}")
+
+    def evict(self):
+        """Entfernt abgelaufene Einträge (mtime = Erstellzeit) und die am längsten ungenutzten, bis die Größengrenze passt"""
+        if not self.enabled or not os.path.isdir(self.cache_dir):
+            return 0
+
+        now = time.time()
+        entries = []
+        removed = 0
+
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                if now - stat.st_mtime > self.max_age:
+                    os.remove(path)
+                    removed += 1
+                else:
+                    entries.append((stat.st_atime, stat.st_size, path))
+
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            os.remove(path)
+            total_size -= size
+            removed += 1
+
+        if removed:
+            logging.info(f"🧹 Gemini-Cache: {removed} Einträge entfernt")
+        return removed
@@ -0,0 +1,185 @@
+# metrics.py - Laufzeit-, Token- und Kostenmessung pro Quelle und Stufe
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+# Preise in USD pro 1 Mio. Tokens (Input, Output), überschreibbar per Umgebung
+DEFAULT_PRICES = {
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-flash-8b': (0.0375, 0.15),
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-2.0-flash': (0.10, 0.40),
+}
+
+
+def edition_key(source_name, edition_date):
+    """Schlüssel für Spans und Zähler: pro Ausgabe, da ein Backfill mehrere Daten derselben Quelle verarbeitet"""
+    return f"{source_name}|{edition_date}"
+
+
+class RunMetrics:
+    """Sammelt Spans (Ausgabe, Stufe) und Zähler eines Laufs und exportiert sie als JSON/Prometheus"""
+
+    def __init__(self, model_name, price_input=None, price_output=None):
+        self.model_name = model_name
+        default_input, default_output = DEFAULT_PRICES.get(model_name, (0.0, 0.0))
+        self.price_input = default_input if price_input is None else price_input
+        self.price_output = default_output if price_output is None else price_output
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.stages = defaultdict(lambda: defaultdict(lambda: {'seconds': 0.0, 'count': 0}))
+        self.counters = defaultdict(lambda: defaultdict(float))
+        self.info = {}
+        self.tier_prices = {}
+
+    def add_tier(self, tier, model_name, price_input=None, price_output=None):
+        """Weiteres Modell (z.B. Detailstufe): seine Tokens zählen zusätzlich als <tier>_prompt_tokens usw."""
+        default_input, default_output = DEFAULT_PRICES.get(model_name, (0.0, 0.0))
+        self.tier_prices[tier] = (
+            default_input if price_input is None else price_input,
+            default_output if price_output is None else price_output,
+        )
+
+    @contextmanager
+    def span(self, source, stage):
+        """Misst die Dauer einer Stufe (summiert bei parallelen Aufrufen)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(source, stage, time.perf_counter() - start)
+
+    def add_time(self, source, stage, seconds):
+        with self.lock:
+            entry = self.stages[source][stage]
+            entry['seconds'] += seconds
+            entry['count'] += 1
+
+    def timed_iter(self, iterable, source, stage):
+        """Misst die Zeit, die im Iterator selbst verbracht wird (z.B. Seitenextraktion im Strom)"""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(source, stage, time.perf_counter() - start)
+                return
+            self.add_time(source, stage, time.perf_counter() - start)
+            yield item
+
+    def incr(self, source, name, value=1):
+        with self.lock:
+            self.counters[source][name] += value
+
+    def record_usage(self, source, response, tier=None):
+        """Übernimmt Token-Zahlen aus response.usage_metadata"""
+        usage = getattr(response, 'usage_metadata', None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, 'prompt_token_count', 0) or 0
+        response_tokens = getattr(usage, 'candidates_token_count', 0) or 0
+        self.incr(source, 'prompt_tokens', prompt_tokens)
+        self.incr(source, 'response_tokens', response_tokens)
+        if tier:
+            self.incr(source, f'{tier}_prompt_tokens', prompt_tokens)
+            self.incr(source, f'{tier}_response_tokens', response_tokens)
+
+    def set_info(self, name, value):
+        with self.lock:
+            self.info[name] = value
+
+    def _cost(self, counters):
+        prompt_tokens = counters.get('prompt_tokens', 0)
+        response_tokens = counters.get('response_tokens', 0)
+        cost = 0.0
+        for tier, (price_input, price_output) in self.tier_prices.items():
+            tier_prompt = counters.get(f'{tier}_prompt_tokens', 0)
+            tier_response = counters.get(f'{tier}_response_tokens', 0)
+            cost += tier_prompt * price_input + tier_response * price_output
+            prompt_tokens -= tier_prompt
+            response_tokens -= tier_response
+        return (cost + prompt_tokens * self.price_input + response_tokens * self.price_output) / 1000000
+
+    def source_report(self, source):
+        """Bericht für eine Ausgabe (wird auch in analysis_metadata gespeichert)"""
+        with self.lock:
+            counters = {name: _number(value) for name, value in self.counters[source].items()}
+            stages = {
+                stage: {'seconds': round(entry['seconds'], 3), 'count': entry['count']}
+                for stage, entry in self.stages[source].items()
+            }
+        counters['cost_usd'] = round(self._cost(counters), 6)
+        return {'stages': stages, 'counters': counters}
+
+    def report(self):
+        """Gesamtbericht des Laufs"""
+        with self.lock:
+            sources = list(set(self.stages) | set(self.counters))
+            info = dict(self.info)
+
+        per_source = {source: self.source_report(source) for source in sources}
+        totals = defaultdict(float)
+        for source_report in per_source.values():
+            for name, value in source_report['counters'].items():
+                totals[name] += value
+
+        return {
+            'started_at': self.started_at.isoformat(),
+            'duration_seconds': round(time.perf_counter() - self.start, 3),
+            'model': self.model_name,
+            'info': info,
+            'totals': {name: round(value, 6) if name == 'cost_usd' else _number(value) for name, value in totals.items()},
+            'sources': per_source,
+        }
+
+    def write_json(self, path):
+        report = self.report()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logging.info(f"📊 Laufbericht geschrieben: {path}")
+        return report
+
+    def write_prometheus(self, path):
+        """Schreibt eine Textfile für den node_exporter (atomar)"""
+        report = self.report()
+        lines = [
+            '# HELP zeitungsanalyse_stage_seconds Summierte Dauer pro Ausgabe und Stufe',
+            '# TYPE zeitungsanalyse_stage_seconds gauge',
+        ]
+        for key, source_report in report['sources'].items():
+            for stage, entry in source_report['stages'].items():
+                lines.append(f'zeitungsanalyse_stage_seconds{{{_labels(key)},stage="{stage}"}} {entry["seconds"]}')
+        lines += [
+            '# HELP zeitungsanalyse_counter Zähler pro Ausgabe (Tokens, Bytes, Zeilen, Retries, Kosten)',
+            '# TYPE zeitungsanalyse_counter gauge',
+        ]
+        for key, source_report in report['sources'].items():
+            for name, value in source_report['counters'].items():
+                lines.append(f'zeitungsanalyse_counter{{{_labels(key)},name="{name}"}} {value}')
+        lines.append(f'zeitungsanalyse_run_duration_seconds {report["duration_seconds"]}')
+        lines.append(f'zeitungsanalyse_run_timestamp_seconds {int(time.time())}')
+
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+
+def _number(value):
+    return int(value) if float(value).is_integer() else round(value, 3)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _labels(key):
+    source, _, edition_date = str(key).partition('|')
+    return f'source="{_label(source)}",edition="{_label(edition_date)}"'
@@ -0,0 +1,38 @@
+# model_routing.py - Modellstufen: günstiges Modell für jeden Chunk, stärkeres nur für wichtige Chunks
+import threading
+
+# Prioritäten, die einen Chunk an die Detailstufe schicken
+DETAIL_PRIORITIES = ('höchste', 'hohe')
+
+
+def needs_detail(articles, min_articles=1):
+    """Ein Chunk geht an die Detailstufe, sobald die Triage min_articles Artikel mit Priorität höchste/hohe findet"""
+    return sum(1 for article in articles if article.get('priority') in DETAIL_PRIORITIES) >= min_articles
+
+
+class ModelTier:
+    """Ein Gemini-Modell mit eigener Parallelität und eigenen Quoten; das Modell entsteht beim ersten Zugriff"""
+
+    def __init__(self, name, model_name, max_workers, rate_limiter, create_model):
+        self.name = name
+        self.model_name = model_name
+        self.max_workers = max_workers
+        self.rate_limiter = rate_limiter
+        self.create_model = create_model
+        self.lock = threading.Lock()
+        self._model = None
+        self._created = False
+
+    @property
+    def model(self):
+        with self.lock:
+            if not self._created:
+                self._model = self.create_model(self.model_name)
+                self._created = True
+            return self._model
+
+    @model.setter
+    def model(self, model):
+        with self.lock:
+            self._model = model
+            self._created = True
@@ -0,0 +1,136 @@
+# ocr.py - OCR-Fallback für gescannte Seiten (optional: pypdfium2, pytesseract, tesseract-ocr)
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Dokument pro Worker-Prozess, wird einmal im Initializer geöffnet
+_worker_document = None
+
+
+def ocr_available():
+    """True, wenn Rasterung (pypdfium2), pytesseract und das tesseract-Binary vorhanden sind"""
+    try:
+        import pypdfium2  # noqa: F401
+        import pytesseract  # noqa: F401
+    except ImportError:
+        return False
+    return shutil.which('tesseract') is not None
+
+
+def _init_worker(pdf_source):
+    global _worker_document
+    import pypdfium2
+    _worker_document = pypdfium2.PdfDocument(pdf_source)
+
+
+def _cache_path(cache_dir, key):
+    return os.path.join(cache_dir, key[:2], f"{key}.txt")
+
+
+def _ocr_page(page_index, dpi, lang, cache_dir):
+    """Rastert eine Seite, sucht den Bild-Hash im Cache und führt sonst tesseract aus -> (Text, Cache-Treffer)"""
+    import pytesseract
+
+    image = _worker_document[page_index].render(scale=dpi / 72).to_pil()
+    key = hashlib.sha256(f"{lang}|{dpi}|{image.size}|".encode('utf-8') + image.tobytes()).hexdigest()
+    path = _cache_path(cache_dir, key)
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read(), True
+    except OSError:
+        pass
+
+    text = pytesseract.image_to_string(image, lang=lang)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+    return text, False
+
+
+class PageOcr:
+    """OCR nur für Seiten unter der Textdichte-Schwelle, parallel in Prozessen, Ergebnis in Seitenreihenfolge"""
+
+    def __init__(self, cache_dir, min_chars=200, workers=2, dpi=300, lang='deu', enabled=True):
+        self.cache_dir = cache_dir
+        self.min_chars = min_chars
+        self.workers = workers
+        self.dpi = dpi
+        self.lang = lang
+        self.enabled = enabled
+        self._available = None
+
+    def available(self):
+        if self._available is None:
+            self._available = self.enabled and ocr_available()
+        return self._available
+
+    def needs_ocr(self, page_text):
+        return len(page_text.strip()) < self.min_chars
+
+    def process(self, pdf_source, pages, stats):
+        """Reicht den Seitenstrom durch; dünne Seiten laufen parallel durch OCR, die Reihenfolge bleibt"""
+        stats.update({'pages_low_density': 0, 'pages_ocr': 0, 'ocr_cache_hits': 0, 'ocr_chars': 0})
+        pending = deque()
+        pool = None
+        warned = False
+
+        try:
+            for page_num, page_text in pages:
+                future = None
+                if self.enabled and self.needs_ocr(page_text):
+                    stats['pages_low_density'] += 1
+                    if self.available():
+                        if pool is None:
+                            # spawn statt fork: Quellen- und Chunk-Threads laufen parallel weiter
+                            pool = ProcessPoolExecutor(
+                                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                initializer=_init_worker, initargs=(pdf_source,)
+                            )
+                        future = pool.submit(_ocr_page, page_num - 1, self.dpi, self.lang, self.cache_dir)
+                    elif not warned:
+                        warned = True
+                        logging.warning(
+                            f"⚠️ Seite {page_num} enthält kaum Text, OCR ist nicht installiert "
+                            "(pypdfium2, pytesseract, tesseract-ocr) - Inhalt geht verloren"
+                        )
+                pending.append((page_num, page_text, future))
+
+                # Fertige Seiten am Anfang der Warteschlange sofort weitergeben
+                while pending and (pending[0][2] is None or pending[0][2].done()):
+                    yield self._resolve(*pending.popleft(), stats)
+
+            while pending:
+                yield self._resolve(*pending.popleft(), stats)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if stats['pages_low_density']:
+            logging.info(
+                f"🔎 OCR: {stats['pages_low_density']} Seiten mit wenig Text, {stats['pages_ocr']} per OCR gelesen "
+                f"({stats['ocr_cache_hits']} aus Cache, {stats['ocr_chars']} Zeichen)"
+            )
+
+    def _resolve(self, page_num, page_text, future, stats):
+        if future is None:
+            return page_num, page_text
+        try:
+            ocr_text, cache_hit = future.result()
+        except Exception as e:
+            logging.warning(f"⚠️ OCR für Seite {page_num} fehlgeschlagen: {e}")
+            return page_num, page_text
+
+        # Nur übernehmen, wenn OCR tatsächlich mehr Text liefert als die Textebene
+        if len(ocr_text.strip()) <= len(page_text.strip()):
+            return page_num, page_text
+        stats['pages_ocr'] += 1
+        stats['ocr_cache_hits'] += int(cache_hit)
+        stats['ocr_chars'] += len(ocr_text)
+        return page_num, ocr_text.strip()
@@ -0,0 +1,118 @@
+# page_diff.py - Seiten-Fingerprints, um unveränderte Seiten nicht erneut zu analysieren
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from dedup import normalize_text, simhash, hamming_distance
+
+
+class PageFingerprintStore:
+    """Vergleicht Seiten mit den Ausgaben der letzten Tage: gleiche Seiten fallen weg, fast gleiche werden gekürzt"""
+
+    def __init__(self, store_path, window_days=3, max_distance=3, keep_chars=300, min_chars=200, enabled=True):
+        self.store_path = store_path
+        self.window_days = window_days
+        self.max_distance = max_distance
+        self.keep_chars = keep_chars
+        self.min_chars = min_chars
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.pages = self._load()
+        # Fingerprints laufender Ausgaben: {(Quelle, Datum): {Seitennummer: Eintrag}}, erst nach dem Speichern übernommen
+        self.pending = {}
+
+    def _load(self):
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return []
+
+    def _save(self):
+        cutoff = (datetime.now() - timedelta(days=self.window_days)).strftime('%Y-%m-%d')
+        self.pages = [entry for entry in self.pages if entry['date'] >= cutoff]
+        os.makedirs(os.path.dirname(self.store_path) or '.', exist_ok=True)
+        tmp_path = f"{self.store_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.pages, f)
+        os.replace(tmp_path, self.store_path)
+
+    def filter_pages(self, pages, source_name, edition_date, stats):
+        """Filtert einen (Seitennummer, Text)-Strom und zählt Ersparnis in `stats`"""
+        stats.update({'pages_total': 0, 'pages_skipped': 0, 'pages_trimmed': 0, 'chars_total': 0, 'chars_saved': 0})
+
+        with self.lock:
+            previous = [
+                entry for entry in self.pages
+                if (entry['source'], entry['date']) != (source_name, edition_date)
+            ]
+        exact = {entry['sha1']: entry for entry in previous}
+        current = {}
+
+        for page_num, page_text in pages:
+            stats['pages_total'] += 1
+            stats['chars_total'] += len(page_text)
+            normalized = normalize_text(page_text)
+
+            if not self.enabled or len(normalized) < self.min_chars:
+                yield page_num, page_text
+                continue
+
+            sha1 = hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+            page_hash = simhash(normalized)
+            current[page_num] = {'sha1': sha1, 'simhash': page_hash, 'source': source_name, 'date': edition_date}
+
+            match = exact.get(sha1)
+            if match:
+                logging.info(f"⏭️ Seite {page_num} unverändert ({match['source']}, {match['date']})")
+                stats['pages_skipped'] += 1
+                stats['chars_saved'] += len(page_text)
+                continue
+
+            if any(hamming_distance(page_hash, entry['simhash']) <= self.max_distance for entry in previous):
+                logging.info(f"✂️ Seite {page_num} fast unverändert, nur Anfang wird analysiert")
+                stats['pages_trimmed'] += 1
+                stats['chars_saved'] += max(0, len(page_text) - self.keep_chars)
+                yield page_num, page_text[:self.keep_chars]
+                continue
+
+            yield page_num, page_text
+
+        if self.enabled:
+            with self.lock:
+                self.pending[(source_name, edition_date)] = current
+
+        if stats['pages_total']:
+            saved_percent = 100 * stats['chars_saved'] / max(1, stats['chars_total'])
+            logging.info(
+                f"📉 Seitenabgleich {source_name}: {stats['pages_skipped']} übersprungen, "
+                f"{stats['pages_trimmed']} gekürzt von {stats['pages_total']} Seiten "
+                f"({stats['chars_saved']} Zeichen, {saved_percent:.0f}% gespart)"
+            )
+
+    def exclude(self, source_name, edition_date, page_numbers):
+        """Seiten aus fehlgeschlagenen Chunks nicht übernehmen - sonst würde der nächste Lauf sie überspringen"""
+        with self.lock:
+            current = self.pending.get((source_name, edition_date), {})
+            for page_num in page_numbers:
+                current.pop(page_num, None)
+
+    def commit(self, source_name, edition_date):
+        """Übernimmt die Fingerprints einer Ausgabe, nachdem sie gespeichert wurde"""
+        with self.lock:
+            current = self.pending.pop((source_name, edition_date), None)
+            if current is None:
+                return
+            self.pages = [
+                entry for entry in self.pages
+                if (entry['source'], entry['date']) != (source_name, edition_date)
+            ] + list(current.values())
+            self._save()
+
+    def discard(self, source_name, edition_date):
+        """Verwirft die Fingerprints einer nicht gespeicherten Ausgabe"""
+        with self.lock:
+            self.pending.pop((source_name, edition_date), None)
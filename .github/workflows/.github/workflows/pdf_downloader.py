@@ -0,0 +1,180 @@
+# pdf_downloader.py - Streamender PDF-Download mit Conditional Requests und Resume
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+
+
+class DownloadError(Exception):
+    """PDF konnte nicht geladen werden"""
+
+
+class IncompleteDownload(DownloadError):
+    """Verbindung vor dem Ende abgebrochen - per Range fortsetzbar"""
+
+
+class PdfDownloader:
+    """Lädt PDFs direkt auf die Platte, merkt sich ETag/Last-Modified und setzt Abbrüche per Range fort"""
+
+    def __init__(self, download_dir, user_agent, timeout=60, max_resumes=3, chunk_size=1024 * 1024):
+        self.download_dir = download_dir
+        self.timeout = timeout
+        self.max_resumes = max_resumes
+        self.chunk_size = chunk_size
+        self.user_agent = user_agent
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        """HTTP-Session, erst beim ersten Download angelegt (requests wird erst dann importiert)"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['User-Agent'] = self.user_agent
+                self._session = session
+            return self._session
+
+    def _paths(self, source_name):
+        slug = re.sub(r'[^a-z0-9]+', '_', source_name.lower()).strip('_')
+        base = os.path.join(self.download_dir, slug)
+        return f"{base}.pdf", f"{base}.pdf.part", f"{base}.json"
+
+    @staticmethod
+    def _load_meta(meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def file_sha256(path):
+        """Prüfsumme einer Datei, blockweise gelesen"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def download(self, source_name, url):
+        """Lädt das PDF und liefert (Pfad, geändert?) - geändert=False bei 304 Not Modified"""
+        import requests
+        os.makedirs(self.download_dir, exist_ok=True)
+        pdf_path, part_path, meta_path = self._paths(source_name)
+        meta = self._load_meta(meta_path)
+
+        # Conditional Request nur, wenn die gespeicherte Datei noch zur Prüfsumme passt
+        conditional = {}
+        if meta.get('url') == url and os.path.exists(pdf_path) and self.file_sha256(pdf_path) == meta.get('sha256'):
+            if meta.get('etag'):
+                conditional['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                conditional['If-Modified-Since'] = meta['last_modified']
+
+        # Ein halb geladenes .part ist nur für dieselbe Version (Validator) wiederverwendbar
+        if meta.get('partial_url') != url and os.path.exists(part_path):
+            os.remove(part_path)
+
+        for attempt in range(self.max_resumes + 1):
+            headers = dict(conditional)
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            if offset and meta.get('partial_validator'):
+                headers['Range'] = f"bytes={offset}-"
+                headers['If-Range'] = meta['partial_validator']
+            elif offset:
+                os.remove(part_path)
+                offset = 0
+
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+                    if response.status_code == 304:
+                        logging.info(f"♻️ PDF unverändert seit letztem Lauf: {source_name}")
+                        return pdf_path, False
+
+                    response.raise_for_status()
+
+                    content_type = response.headers.get('content-type', '')
+                    if not content_type.startswith('application/pdf'):
+                        raise DownloadError(f"Kein PDF erhalten, Content-Type: {content_type}")
+
+                    if response.status_code == 206 and offset:
+                        mode = 'ab'
+                        logging.info(f"⏩ Setze Download fort ab Byte {offset}")
+                    else:
+                        mode = 'wb'
+                        offset = 0
+
+                    validator = response.headers.get('ETag') or response.headers.get('Last-Modified')
+                    meta.update({'partial_url': url, 'partial_validator': validator})
+                    self._save_meta(meta_path, meta)
+
+                    expected = self._expected_size(response, offset)
+                    with open(part_path, mode) as f:
+                        for block in response.iter_content(chunk_size=self.chunk_size):
+                            f.write(block)
+
+                    size = os.path.getsize(part_path)
+                    if expected is not None and size != expected:
+                        raise IncompleteDownload(f"Unvollständig: {size}/{expected} bytes")
+
+                    return self._finish(url, response, pdf_path, part_path, meta_path), True
+
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, IncompleteDownload) as e:
+                if attempt == self.max_resumes:
+                    raise DownloadError(f"Download nach {attempt + 1} Versuchen abgebrochen: {e}") from e
+                logging.warning(f"⚠️ Download unterbrochen ({e}), versuche fortzusetzen ({attempt + 1}/{self.max_resumes})")
+
+    @staticmethod
+    def _expected_size(response, offset):
+        content_range = response.headers.get('Content-Range', '')
+        match = re.search(r'/(\d+)$', content_range)
+        if match:
+            return int(match.group(1))
+        length = response.headers.get('Content-Length')
+        if length is not None and 'Content-Encoding' not in response.headers:
+            return offset + int(length)
+        return None
+
+    def _finish(self, url, response, pdf_path, part_path, meta_path):
+        """Prüft Inhalt und Prüfsumme und ersetzt die alte Ausgabe atomar"""
+        with open(part_path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                os.remove(part_path)
+                raise DownloadError("Datei ist kein gültiges PDF")
+
+        sha256 = self.file_sha256(part_path)
+        os.replace(part_path, pdf_path)
+
+        meta = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'sha256': sha256,
+            'size': os.path.getsize(pdf_path)
+        }
+        self._save_meta(meta_path, meta)
+        logging.info(f"✅ PDF erfolgreich heruntergeladen: {meta['size']} bytes (sha256 {sha256[:12]})")
+        return pdf_path
+
+    def remove(self, source_name):
+        """Löscht PDF, Teil-Download und Metadaten einer Quelle (z.B. nach einem Backfill)"""
+        for path in self._paths(source_name):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _save_meta(meta_path, meta):
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
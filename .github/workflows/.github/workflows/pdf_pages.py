@@ -0,0 +1,55 @@
+# pdf_pages.py - Seitenweise, optional parallele PDF-Text-Extraktion
+import io
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Reader pro Worker-Prozess, wird einmal im Initializer geöffnet
+_worker_reader = None
+
+
+def open_pdf(pdf_source):
+    """Öffnet ein PDF aus Bytes oder einem Dateipfad (pypdf wird erst hier importiert)"""
+    from pypdf import PdfReader
+    if isinstance(pdf_source, (bytes, bytearray)):
+        return PdfReader(io.BytesIO(pdf_source))
+    return PdfReader(pdf_source)
+
+
+def format_page(page_num, page_text):
+    """Formatiert eine Seite mit dem Seitenmarker für Gemini"""
+    return f"=== SEITE {page_num} ===\n{page_text}\n\n"
+
+
+def _init_worker(pdf_source):
+    global _worker_reader
+    _worker_reader = open_pdf(pdf_source)
+
+
+def _extract_page(page_index):
+    return page_index + 1, _worker_reader.pages[page_index].extract_text() or ""
+
+
+def iter_pdf_pages(pdf_source, workers=1, min_pages_for_pool=8):
+    """Liefert (Seitennummer, Text) in Seitenreihenfolge, sobald die Seite extrahiert ist"""
+    reader = open_pdf(pdf_source)
+    page_count = len(reader.pages)
+    logging.info(f"📄 PDF hat {page_count} Seiten")
+
+    if workers <= 1 or page_count < min_pages_for_pool:
+        for page_num, page in enumerate(reader.pages, 1):
+            yield page_num, page.extract_text() or ""
+        return
+
+    # pypdf ist CPU-gebunden -> Seiten auf Prozesse verteilen, map() hält die Reihenfolge.
+    # spawn statt fork: der Aufrufer hat laufende Threads (Locks, HTTP-Clients), die ein Fork halb kopieren würde
+    del reader
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(pdf_source,)) as pool:
+        yield from pool.map(_extract_page, range(page_count), chunksize=max(1, page_count // (workers * 4)))
+
+
+def default_workers():
+    """Standardanzahl Extraktions-Prozesse"""
+    return min(4, os.cpu_count() or 1)
@@ -0,0 +1,111 @@
+# rate_limiter.py - Adaptiver Token-Bucket-Limiter für Gemini-Anfragen
+import random
+import threading
+import time
+from urllib.parse import urlparse
+
+
+def is_rate_limit_error(error):
+    """Erkennt 429 / ResourceExhausted Fehler der Gemini API (Typ und Statuscode vor dem Fehlertext)"""
+    if type(error).__name__ in ('ResourceExhausted', 'TooManyRequests'):
+        return True
+    if getattr(error, 'code', None) == 429 or getattr(error, 'status_code', None) == 429:
+        return True
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    # Nur noch Text: Statuscode am Anfang oder gRPC-Status - keine beliebige "429" (Token-Zahlen, IDs)
+    message = str(error)
+    return message.startswith('429 ') or 'RESOURCE_EXHAUSTED' in message
+
+
+def backoff_delay(attempt, base=2.0, maximum=60.0):
+    """Exponentielles Backoff mit Jitter (Sekunden)"""
+    delay = min(maximum, base * (2 ** attempt))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class TokenBucket:
+    """Thread-sicherer Token-Bucket, der sich pro Minute auffüllt"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Sekunden bis `amount` Tokens verfügbar sind (0 = sofort)"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """Begrenzt Anfragen/Minute und Tokens/Minute, drosselt bei 429 automatisch"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute, min_factor=0.1):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_rate = self.requests.rate
+        self.min_rate = self.max_rate * min_factor
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=0):
+        """Blockiert bis eine Anfrage mit `tokens` Tokens gesendet werden darf"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                wait = max(
+                    self.paused_until - now,
+                    self.requests.wait_time(1, now),
+                    self.tokens.wait_time(tokens, now)
+                )
+                if wait <= 0:
+                    self.requests.take(1)
+                    self.tokens.take(tokens)
+                    return
+            time.sleep(min(wait, 5.0))
+
+    def report_success(self):
+        """Erholt die Anfragerate langsam wieder (additive increase)"""
+        with self.lock:
+            self.requests.rate = min(self.max_rate, self.requests.rate + self.max_rate * 0.05)
+
+    def report_throttled(self, pause_seconds):
+        """Halbiert die Anfragerate und pausiert alle Threads (multiplicative decrease)"""
+        with self.lock:
+            self.requests.rate = max(self.min_rate, self.requests.rate / 2)
+            now = time.monotonic()
+            self.requests.tokens = 0.0
+            self.requests.updated = now
+            self.paused_until = max(self.paused_until, now + pause_seconds)
+
+
+class HostThrottle:
+    """Höflichkeitsabstand zwischen Anfragen an denselben Host"""
+
+    def __init__(self, delay_seconds):
+        self.delay = delay_seconds
+        self.next_slot = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url):
+        """Reserviert den nächsten freien Slot für den Host der URL und wartet darauf"""
+        host = urlparse(url).netloc
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot.get(host, 0.0))
+            self.next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
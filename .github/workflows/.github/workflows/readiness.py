@@ -0,0 +1,83 @@
+# readiness.py - Nicht blockierende Verfügbarkeitsprüfung der Streamlit-App neben der Pipeline
+import logging
+import threading
+import time
+
+from rate_limiter import backoff_delay
+
+
+class ReadinessProbe:
+    """Prüft im Hintergrund mit exponentiellem Backoff (Jitter) bis Erfolg oder Deadline"""
+
+    def __init__(self, check, deadline=900, base_delay=5, max_delay=120):
+        self.check = check
+        self.deadline = deadline
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.stopped = threading.Event()
+        self.thread = None
+        self.lock = threading.Lock()
+        self.state = 'pending'
+        self.attempts = 0
+        self.online_after = None
+        self.last_error = None
+        self.start_time = None
+
+    def start(self):
+        self.start_time = time.monotonic()
+        self.thread = threading.Thread(target=self._run, name='app-probe', daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        attempt = 0
+        while not self.stopped.is_set():
+            try:
+                online = self.check()
+                error = None
+            except Exception as e:
+                # Fehlversuche sind bis zur Deadline normal (App wacht auf) - nur der Endstand wird gewarnt
+                logging.debug(f"App-Prüfung {self.attempts + 1} fehlgeschlagen: {e}")
+                online, error = False, str(e)
+
+            elapsed = time.monotonic() - self.start_time
+            with self.lock:
+                self.attempts += 1
+                self.last_error = error
+                if online:
+                    self.state = 'online'
+                    self.online_after = round(elapsed, 1)
+                    return
+
+            delay = backoff_delay(attempt, self.base_delay, self.max_delay)
+            if elapsed + delay > self.deadline:
+                with self.lock:
+                    self.state = 'offline'
+                logging.warning(
+                    f"⚠️ App nach {self.attempts} Versuchen ({elapsed:.0f}s) nicht erreichbar - Analyse läuft trotzdem "
+                    f"(zuletzt: {self.last_error})"
+                )
+                return
+            attempt += 1
+            self.stopped.wait(delay)
+
+    def stop(self):
+        """Beendet die Prüfung (z.B. am Ende des Laufs) und liefert den Status"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join(timeout=5)
+        with self.lock:
+            # Lauf endete vor Erfolg oder Deadline: bisher nicht erreichbar bzw. noch gar nicht geprüft
+            if self.state == 'pending':
+                self.state = 'offline' if self.attempts else 'unknown'
+        return self.status()
+
+    def status(self):
+        """Status für den Laufbericht"""
+        with self.lock:
+            return {
+                'state': self.state,
+                'attempts': self.attempts,
+                'online_after_seconds': self.online_after,
+                'last_error': self.last_error,
+            }
@@ -0,0 +1,201 @@
+# relevance_filter.py - Lokaler Relevanz-Vorfilter vor Gemini (Anzeigen, Traueranzeigen, Wetter, TV, Tabellen)
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+_TOKEN = re.compile(r'[a-zäöüß]{3,}')
+
+# Startgewichte (log-odds), solange kein Modell aus gespeicherten Artikeln trainiert ist
+SEED_WEIGHTS = {
+    # JuLi-relevant
+    'stadtrat': 2.0, 'gemeinderat': 2.0, 'kreistag': 2.0, 'landtag': 1.5, 'bürgermeister': 2.0,
+    'oberbürgermeister': 2.0, 'landrat': 1.5, 'fraktion': 1.5, 'haushalt': 1.5, 'beschluss': 1.0,
+    'antrag': 1.0, 'schule': 1.5, 'schulen': 1.5, 'hochschule': 1.5, 'universität': 1.5, 'ausbildung': 1.5,
+    'kita': 1.0, 'unternehmen': 1.0, 'gewerbe': 1.5, 'gewerbegebiet': 1.5, 'investition': 1.0,
+    'arbeitsplätze': 1.0, 'verkehr': 1.0, 'radweg': 1.5, 'straßenbahn': 1.0, 'nahverkehr': 1.5,
+    'sanierung': 1.0, 'digitalisierung': 2.0, 'breitband': 1.5, 'glasfaser': 1.5, 'klimaschutz': 1.0,
+    'bürgerbeteiligung': 2.0, 'jugend': 1.5, 'jugendliche': 1.5, 'jugendzentrum': 1.5, 'wahl': 1.0,
+    'förderung': 1.0, 'stadtverwaltung': 1.5, 'verwaltung': 1.0,
+    # Klar irrelevant
+    'anzeige': -2.0, 'anzeigen': -2.0, 'traueranzeige': -3.0, 'trauer': -2.0, 'verstorben': -2.0,
+    'entschlafen': -3.0, 'beisetzung': -3.0, 'trauerfeier': -3.0, 'gedenken': -1.5, 'nachruf': -1.5,
+    'wetter': -2.0, 'wettervorhersage': -3.0, 'regen': -1.0, 'bewölkt': -2.0, 'sonnig': -2.0,
+    'grad': -1.0, 'horoskop': -3.0, 'sudoku': -3.0, 'kreuzworträtsel': -3.0, 'rätsel': -2.0,
+    'fernsehen': -1.5, 'programm': -1.0, 'ard': -2.0, 'zdf': -2.0, 'rtl': -2.0, 'sat': -1.5,
+    'tatort': -2.0, 'serie': -1.5, 'spielfilm': -2.5, 'tabelle': -1.5, 'tore': -1.5, 'spieltag': -1.5,
+    'angebot': -1.5, 'preis': -1.0, 'rabatt': -2.5, 'euro': -0.5, 'immobilien': -1.5, 'mietgesuche': -3.0,
+    'stellenangebote': -2.0, 'bekanntschaften': -3.0, 'kleinanzeigen': -3.0,
+}
+
+HIGH_PRIORITIES = ('höchste', 'hohe')
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def split_segments(page_text, target_chars=800, max_chars=1500):
+    """Zerlegt eine Seite in artikelgroße Abschnitte (Absätze, lange Blöcke zeilenweise)"""
+    segments = []
+    for block in re.split(r'\n\s*\n', page_text):
+        if not block.strip():
+            continue
+        if len(block) <= max_chars:
+            segments.append(block)
+            continue
+
+        current = []
+        current_len = 0
+        for line in block.split('\n'):
+            if current and current_len + len(line) > target_chars:
+                segments.append('\n'.join(current))
+                current, current_len = [], 0
+            current.append(line)
+            current_len += len(line) + 1
+        if current:
+            segments.append('\n'.join(current))
+    return segments
+
+
+class RelevanceFilter:
+    """Linearer Token-Scorer (Naive-Bayes-log-odds) über Abschnitte; trainierbar aus gespeicherten Artikeln"""
+
+    def __init__(self, model_path, drop_threshold=-0.8, trim_threshold=-0.3, keep_chars=200,
+                 min_chars=120, audit_path=None, enabled=True, smoothing=5):
+        self.model_path = model_path
+        self.drop_threshold = drop_threshold
+        self.trim_threshold = trim_threshold
+        self.keep_chars = keep_chars
+        self.min_chars = min_chars
+        self.audit_path = audit_path
+        self.enabled = enabled
+        self.smoothing = smoothing
+        self.lock = threading.Lock()
+        self.weights, self.trained_at = self._load()
+
+    def _load(self):
+        try:
+            with open(self.model_path, 'r', encoding='utf-8') as f:
+                model = json.load(f)
+            return {**model['weights'], **SEED_WEIGHTS}, model.get('trained_at')
+        except (OSError, ValueError, KeyError):
+            return dict(SEED_WEIGHTS), None
+
+    def needs_training(self, max_age_days):
+        if not self.trained_at:
+            return True
+        return datetime.fromisoformat(self.trained_at) < datetime.now() - timedelta(days=max_age_days)
+
+    def train(self, articles, min_count=3, max_features=5000):
+        """Lernt Token-Gewichte aus Artikeln: Priorität höchste/hohe gegen standard"""
+        positive, negative = Counter(), Counter()
+        for article in articles:
+            tokens = tokenize(' '.join(str(article.get(field) or '') for field in ('title', 'summary')))
+            (positive if article.get('priority') in HIGH_PRIORITIES else negative).update(tokens)
+
+        if not positive or not negative:
+            logging.warning("⚠️ Zu wenig Trainingsdaten für den Relevanzfilter - nutze Startgewichte")
+            return False
+
+        vocabulary = [
+            token for token in set(positive) | set(negative)
+            if positive[token] + negative[token] >= min_count
+        ]
+        pos_total = sum(positive.values()) + len(vocabulary)
+        neg_total = sum(negative.values()) + len(vocabulary)
+        learned = {
+            token: max(-3.0, min(3.0, math.log((positive[token] + 1) / pos_total)
+                                 - math.log((negative[token] + 1) / neg_total)))
+            for token in vocabulary
+        }
+        learned = dict(sorted(learned.items(), key=lambda item: -abs(item[1]))[:max_features])
+
+        trained_at = datetime.now().isoformat()
+        os.makedirs(os.path.dirname(self.model_path) or '.', exist_ok=True)
+        tmp_path = f"{self.model_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'trained_at': trained_at, 'articles': len(articles), 'weights': learned}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.model_path)
+
+        with self.lock:
+            self.weights = {**learned, **SEED_WEIGHTS}
+            self.trained_at = trained_at
+        logging.info(f"🎓 Relevanzfilter trainiert: {len(articles)} Artikel, {len(learned)} Merkmale")
+        return True
+
+    def train_from_supabase(self, supabase, limit=5000):
+        """Trainiert aus den zuletzt gespeicherten Artikeln (nur die benötigten Spalten)"""
+        try:
+            result = supabase.table('articles').select('title, summary, priority') \
+                .order('id', desc=True).limit(limit).execute()
+            return self.train(result.data)
+        except Exception as e:
+            logging.warning(f"⚠️ Relevanzfilter konnte nicht trainiert werden: {e}")
+            return False
+
+    def score(self, text):
+        """Mittleres Gewicht der bekannten Tokens, zur 0 hin geglättet (wenige Treffer = neutral)"""
+        weights = self.weights
+        known = [weights[token] for token in tokenize(text) if token in weights]
+        return sum(known) / (len(known) + self.smoothing)
+
+    def _audit(self, entries):
+        if not self.audit_path or not entries:
+            return
+        os.makedirs(os.path.dirname(self.audit_path) or '.', exist_ok=True)
+        with self.lock, open(self.audit_path, 'a', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def filter_pages(self, pages, source_name, edition_date, stats):
+        """Filtert Abschnitte eines (Seitennummer, Text)-Stroms; verworfene/gekürzte landen im Audit-Log"""
+        stats.update({'segments_total': 0, 'segments_dropped': 0, 'segments_trimmed': 0,
+                      'chars_filtered': 0})
+
+        for page_num, page_text in pages:
+            if not self.enabled:
+                yield page_num, page_text
+                continue
+
+            kept = []
+            audit = []
+            for segment in split_segments(page_text):
+                stats['segments_total'] += 1
+                if len(segment) < self.min_chars:
+                    kept.append(segment)
+                    continue
+
+                score = self.score(segment)
+                if score < self.drop_threshold:
+                    action, remaining = 'dropped', ''
+                    stats['segments_dropped'] += 1
+                elif score < self.trim_threshold and len(segment) > self.keep_chars:
+                    action, remaining = 'trimmed', segment[:self.keep_chars]
+                    stats['segments_trimmed'] += 1
+                else:
+                    kept.append(segment)
+                    continue
+
+                stats['chars_filtered'] += len(segment) - len(remaining)
+                if remaining:
+                    kept.append(remaining)
+                audit.append({
+                    'source': source_name, 'date': edition_date, 'page': page_num, 'action': action,
+                    'score': round(score, 3), 'chars': len(segment), 'text': segment[:300],
+                })
+
+            self._audit(audit)
+            if kept:
+                yield page_num, '\n\n'.join(kept)
+
+        if stats['segments_total']:
+            logging.info(
+                f"🧹 Relevanzfilter {source_name}: {stats['segments_dropped']} verworfen, "
+                f"{stats['segments_trimmed']} gekürzt von {stats['segments_total']} Abschnitten "
+                f"({stats['chars_filtered']} Zeichen)"
+            )
@@ -0,0 +1,290 @@
+# search_index.py - Lokaler Volltext-Index (SQLite FTS5) über Ausgaben und analysierte Artikel
+#
+# Wird nach jeder gespeicherten Analyse fortgeschrieben und enthält den vollständigen Text
+# (in Supabase landen nur die ersten 10.000 Zeichen).
+#
+#   python search_index.py "stadtrat haushalt" --priority höchste --from 2024-01-01
+#   python search_index.py "radweg" --fulltext --source "Mitteldeutsche Zeitung"
+#   python search_index.py --import-supabase
+import argparse
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS editions (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL,
+    analysis_id INTEGER,
+    source TEXT NOT NULL,
+    edition_date TEXT NOT NULL,
+    text_length INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS editions_source_date ON editions (source, edition_date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS editions_fts USING fts5 (
+    text, tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    edition_id INTEGER NOT NULL REFERENCES editions (id),
+    title TEXT NOT NULL,
+    category TEXT,
+    priority TEXT,
+    page TEXT,
+    summary TEXT,
+    relevance TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_edition ON articles (edition_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5 (
+    title, summary, relevance, category,
+    content = 'articles', content_rowid = 'id', tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_QUERY_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def to_fts_query(text):
+    """Macht aus Freitext eine sichere FTS5-Abfrage: alle Wörter müssen vorkommen, Präfixsuche"""
+    return ' '.join(f'"{token}"*' for token in _QUERY_TOKEN.findall(text))
+
+
+class SearchIndex:
+    """SQLite-FTS5-Index; eine Verbindung, durch ein Lock für die Quellen-Threads geschützt"""
+
+    def __init__(self, db_path, enabled=True):
+        self.db_path = db_path
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.conn = None
+        if enabled:
+            os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(db_path, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self.conn.execute('PRAGMA journal_mode = WAL')
+            self.conn.executescript(SCHEMA)
+
+    def add_analysis(self, name, source_name, edition_date, text, articles, analysis_id=None):
+        """Schreibt eine Ausgabe samt Artikeln (ersetzt einen früheren Stand mit gleichem Namen)"""
+        if not self.enabled:
+            return None
+
+        with self.lock, self.conn:
+            self._delete_edition(name)
+            cursor = self.conn.execute(
+                'INSERT INTO editions (name, analysis_id, source, edition_date, text_length, indexed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (name, analysis_id, source_name, edition_date, len(text), datetime.now().isoformat())
+            )
+            edition_id = cursor.lastrowid
+            self.conn.execute('INSERT INTO editions_fts (rowid, text) VALUES (?, ?)', (edition_id, text))
+
+            for article in articles:
+                row = (
+                    edition_id, article['title'], article.get('category'), article.get('priority'),
+                    article.get('page'), article.get('summary'), article.get('relevance')
+                )
+                cursor = self.conn.execute(
+                    'INSERT INTO articles (edition_id, title, category, priority, page, summary, relevance) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)', row
+                )
+                self.conn.execute(
+                    'INSERT INTO articles_fts (rowid, title, summary, relevance, category) VALUES (?, ?, ?, ?, ?)',
+                    (cursor.lastrowid, row[1], row[5], row[6], row[2])
+                )
+        return edition_id
+
+    def _delete_edition(self, name):
+        existing = self.conn.execute('SELECT id FROM editions WHERE name = ?', (name,)).fetchone()
+        if not existing:
+            return
+        edition_id = existing['id']
+        for article in self.conn.execute('SELECT * FROM articles WHERE edition_id = ?', (edition_id,)).fetchall():
+            self.conn.execute(
+                "INSERT INTO articles_fts (articles_fts, rowid, title, summary, relevance, category) "
+                "VALUES ('delete', ?, ?, ?, ?, ?)",
+                (article['id'], article['title'], article['summary'], article['relevance'], article['category'])
+            )
+        self.conn.execute('DELETE FROM articles WHERE edition_id = ?', (edition_id,))
+        self.conn.execute('DELETE FROM editions_fts WHERE rowid = ?', (edition_id,))
+        self.conn.execute('DELETE FROM editions WHERE id = ?', (edition_id,))
+
+    @staticmethod
+    def _filters(source=None, date_from=None, date_to=None):
+        clauses, params = [], []
+        for clause, value in (('e.source = ?', source), ('e.edition_date >= ?', date_from),
+                              ('e.edition_date <= ?', date_to)):
+            if value:
+                clauses.append(clause)
+                params.append(value)
+        return clauses, params
+
+    def search_articles(self, query, source=None, category=None, priority=None,
+                        date_from=None, date_to=None, limit=20, raw=False):
+        """Artikel nach Relevanz (bm25, Titel stärker gewichtet), optional gefiltert"""
+        clauses, params = self._filters(source, date_from, date_to)
+        if category:
+            clauses.append('a.category = ?')
+            params.append(category)
+        if priority:
+            clauses.append('a.priority = ?')
+            params.append(priority)
+
+        if query:
+            sql = (
+                "SELECT a.*, e.source, e.edition_date, e.name AS analysis_name, "
+                "snippet(articles_fts, 1, '[', ']', ' … ', 12) AS snippet "
+                "FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                "JOIN editions e ON e.id = a.edition_id WHERE articles_fts MATCH ?"
+            )
+            params.insert(0, query if raw else to_fts_query(query))
+            order = 'bm25(articles_fts, 5.0, 2.0, 1.0, 1.0)'
+        else:
+            sql = (
+                "SELECT a.*, e.source, e.edition_date, e.name AS analysis_name, a.summary AS snippet "
+                "FROM articles a JOIN editions e ON e.id = a.edition_id WHERE 1 = 1"
+            )
+            order = 'e.edition_date DESC, a.id'
+
+        sql += ''.join(f' AND {clause}' for clause in clauses) + f' ORDER BY {order} LIMIT ?'
+        with self.lock:
+            return [dict(row) for row in self.conn.execute(sql, params + [limit]).fetchall()]
+
+    def search_text(self, query, source=None, date_from=None, date_to=None, limit=20, raw=False):
+        """Ausgaben, deren Volltext die Suchbegriffe enthält, mit Textausschnitt"""
+        clauses, params = self._filters(source, date_from, date_to)
+        match = query if raw else to_fts_query(query)
+        sql = (
+            "SELECT e.id, e.name AS analysis_name, e.source, e.edition_date, e.text_length "
+            "FROM editions_fts JOIN editions e ON e.id = editions_fts.rowid WHERE editions_fts MATCH ?"
+        )
+        sql += ''.join(f' AND {clause}' for clause in clauses) + ' ORDER BY bm25(editions_fts) LIMIT ?'
+
+        with self.lock:
+            rows = [dict(row) for row in self.conn.execute(sql, [match] + params + [limit]).fetchall()]
+            # Ausschnitte erst für die Treffer der Seite - snippet() über ganze Ausgaben ist der teure Teil
+            placeholders = ', '.join('?' * len(rows))
+            snippets = dict(self.conn.execute(
+                "SELECT rowid, snippet(editions_fts, 0, '[', ']', ' … ', 16) FROM editions_fts "
+                f"WHERE editions_fts MATCH ? AND rowid IN ({placeholders})",
+                [match] + [row['id'] for row in rows]
+            ).fetchall()) if rows else {}
+
+        for row in rows:
+            row['snippet'] = snippets.get(row.pop('id'), '')
+        return rows
+
+    def is_indexed(self, name):
+        with self.lock:
+            return self.conn.execute('SELECT 1 FROM editions WHERE name = ?', (name,)).fetchone() is not None
+
+    def stats(self):
+        with self.lock:
+            editions, first, last = self.conn.execute(
+                'SELECT COUNT(*), MIN(edition_date), MAX(edition_date) FROM editions'
+            ).fetchone()
+            articles = self.conn.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        return {'editions': editions, 'articles': articles, 'first_edition': first, 'last_edition': last}
+
+    def import_from_supabase(self, supabase, page_size=500):
+        """Übernimmt bestehende Analysen aus Supabase (dort nur gekürzter Text) - zum erstmaligen Befüllen"""
+        imported = 0
+        start = 0
+        while True:
+            analyses = supabase.table('analyses').select('id, name, original_text, analysis_metadata, created_at') \
+                .order('id').range(start, start + page_size - 1).execute().data
+            if not analyses:
+                break
+            for analysis in analyses:
+                if self.is_indexed(analysis['name']):
+                    continue
+                metadata = analysis.get('analysis_metadata') or {}
+                articles = supabase.table('articles') \
+                    .select('title, category, priority, page_number, summary, relevance') \
+                    .eq('analysis_id', analysis['id']).execute().data
+                self.add_analysis(
+                    analysis['name'],
+                    metadata.get('source', 'unbekannt'),
+                    metadata.get('edition_date') or analysis['created_at'][:10],
+                    analysis.get('original_text') or '',
+                    [{**article, 'page': article.get('page_number')} for article in articles],
+                    analysis_id=analysis['id'],
+                )
+                imported += 1
+            start += page_size
+        logging.info(f"📥 {imported} Analysen aus Supabase in den Suchindex übernommen")
+        return imported
+
+    def close(self):
+        if self.conn:
+            self.conn.close()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Lokale Volltextsuche über analysierte Zeitungsausgaben')
+    parser.add_argument('query', nargs='?', default='', help='Suchbegriffe (alle müssen vorkommen, Präfixsuche)')
+    parser.add_argument('--index', default=os.getenv('SEARCH_INDEX_PATH', '.cache/search_index.sqlite'))
+    parser.add_argument('--fulltext', action='store_true', help='Im Volltext der Ausgaben statt in Artikeln suchen')
+    parser.add_argument('--source')
+    parser.add_argument('--category')
+    parser.add_argument('--priority', choices=['höchste', 'hohe', 'standard'])
+    parser.add_argument('--from', dest='date_from', help='Ab Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--to', dest='date_to', help='Bis Ausgabedatum (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--raw', action='store_true', help='Abfrage unverändert als FTS5-Syntax (AND/OR/NEAR)')
+    parser.add_argument('--json', action='store_true', help='Ergebnisse als JSON ausgeben')
+    parser.add_argument('--stats', action='store_true', help='Umfang des Index anzeigen')
+    parser.add_argument('--import-supabase', action='store_true', help='Bestehende Analysen aus Supabase übernehmen')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    index = SearchIndex(args.index)
+
+    if args.import_supabase:
+        from dotenv import load_dotenv
+        from supabase import create_client
+        load_dotenv()
+        index.import_from_supabase(create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_ANON_KEY')))
+
+    if args.stats or not (args.query or args.category or args.priority or args.source):
+        print(json.dumps(index.stats(), ensure_ascii=False, indent=2))
+        return
+    if args.fulltext and not args.query:
+        sys.exit("❌ Volltextsuche braucht Suchbegriffe")
+
+    start = time.perf_counter()
+    try:
+        if args.fulltext:
+            results = index.search_text(args.query, args.source, args.date_from, args.date_to, args.limit, args.raw)
+        else:
+            results = index.search_articles(args.query, args.source, args.category, args.priority,
+                                            args.date_from, args.date_to, args.limit, args.raw)
+    except sqlite3.OperationalError as e:
+        sys.exit(f"❌ Ungültige Suchanfrage: {e}")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    for row in results:
+        title = row.get('title') or row['analysis_name']
+        details = f" | {row['priority']} | {row['category']} | S. {row['page']}" if 'title' in row else ''
+        print(f"{row['edition_date']} {row['source']}{details}\n  {title}\n  {row['snippet']}\n")
+    print(f"🔎 {len(results)} Treffer in {elapsed_ms:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
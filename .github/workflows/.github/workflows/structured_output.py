@@ -0,0 +1,91 @@
+# structured_output.py - JSON-Schema und Parser für strukturierte Gemini-Antworten
+import json
+
+CATEGORIES = [
+    'Kommunalpolitik',
+    'Wirtschaft & Gewerbe',
+    'Bildung',
+    'Verkehr & Infrastruktur',
+    'Digitalisierung & Innovation',
+    'Umwelt & Nachhaltigkeit',
+    'Bürgerbeteiligung & Demokratie',
+    'Jugendthemen',
+    'Kultur & Events',
+    'Sport',
+    'Soziales',
+    'Sonstiges',
+]
+
+# Antwortschema für response_schema (OpenAPI-Subset der Gemini API)
+ARTICLE_SCHEMA = {
+    'type': 'ARRAY',
+    'items': {
+        'type': 'OBJECT',
+        'properties': {
+            'category': {'type': 'STRING', 'enum': CATEGORIES},
+            'title': {'type': 'STRING'},
+            'summary': {'type': 'STRING'},
+            'page': {'type': 'STRING'},
+            'relevance': {'type': 'STRING'},
+        },
+        'required': ['category', 'title', 'summary', 'page', 'relevance'],
+    },
+}
+
+_FIELDS = ('category', 'title', 'summary', 'page', 'relevance')
+_decoder = json.JSONDecoder()
+
+
+def validate_article(item):
+    """Prüft ein Artikel-Objekt und liefert es normalisiert zurück (oder None)"""
+    if not isinstance(item, dict):
+        return None
+    title = item.get('title')
+    if not isinstance(title, str) or not title.strip():
+        return None
+
+    article = {field: str(item.get(field) or '').strip() for field in _FIELDS}
+    article['category'] = article['category'] or 'Allgemein'
+    article['page'] = article['page'] or 'nicht erkennbar'
+    return article
+
+
+def split_segments(text):
+    """Zerlegt die kombinierte Analyse in JSON-Werte und Freitext-Reste (z.B. Fehlermeldungen, Legacy-Format)"""
+    pos = 0
+    length = len(text)
+
+    while pos < length:
+        while pos < length and text[pos].isspace():
+            pos += 1
+        if pos >= length:
+            break
+
+        if text[pos] in '[{':
+            try:
+                value, pos = _decoder.raw_decode(text, pos)
+                yield 'json', value
+                continue
+            except ValueError:
+                pass
+
+        # Freitext bis zum nächsten Chunk, der mit JSON beginnt
+        end = length
+        for opener in ('\n\n[', '\n\n{'):
+            found = text.find(opener, pos)
+            if found != -1:
+                end = min(end, found)
+        yield 'text', text[pos:end]
+        pos = end
+
+
+def articles_from_json(value):
+    """Liefert die gültigen Artikel aus einem JSON-Wert (Liste oder {"articles": [...]})"""
+    if isinstance(value, dict):
+        value = value.get('articles', [value])
+    if not isinstance(value, list):
+        return [], 0
+
+    articles = [validate_article(item) for item in value]
+    valid = [article for article in articles if article]
+    return valid, len(articles) - len(valid)
@@ -0,0 +1,107 @@
+-- supabase_functions.sql - Datenbankfunktionen für die automatische Zeitungsanalyse
+-- Einmalig im Supabase SQL-Editor ausführen.
+
+-- Speichert eine Analyse samt Artikeln in einer Transaktion (ein HTTP-Round-Trip).
+-- Schlägt ein Artikel-Insert fehl, wird auch die Analyse nicht angelegt.
+create or replace function save_analysis_with_articles(analysis jsonb, articles jsonb)
+returns analyses.id%type
+language plpgsql
+as $$
+declare
+    new_id analyses.id%type;
+begin
+    insert into analyses (
+        name,
+        original_text,
+        total_articles,
+        high_priority_count,
+        medium_priority_count,
+        analysis_metadata
+    )
+    values (
+        analysis->>'name',
+        analysis->>'original_text',
+        (analysis->>'total_articles')::int,
+        (analysis->>'high_priority_count')::int,
+        (analysis->>'medium_priority_count')::int,
+        analysis->'analysis_metadata'
+    )
+    returning id into new_id;
+
+    insert into articles (analysis_id, title, category, priority, page_number, summary, relevance)
+    select
+        new_id,
+        a->>'title',
+        a->>'category',
+        a->>'priority',
+        a->>'page_number',
+        a->>'summary',
+        a->>'relevance'
+    from jsonb_array_elements(articles) as a;
+
+    return new_id;
+end;
+$$;
+
+-- Tageswerte pro Quelle (Ausgabedatum aus den Metadaten, sonst Speicherdatum).
+create or replace view analysis_daily_stats as
+select
+    coalesce((a.analysis_metadata->>'edition_date')::date, a.created_at::date) as edition_date,
+    coalesce(a.analysis_metadata->>'source', 'unbekannt') as source,
+    count(*) as analyses,
+    sum(a.total_articles) as total_articles,
+    sum(a.high_priority_count) as high_priority_count,
+    sum(a.medium_priority_count) as medium_priority_count
+from analyses a
+group by 1, 2;
+
+-- Statistik eines Zeitraums als ein JSON-Dokument (ein Round-Trip, nur Aggregate):
+-- Summen, Verlauf pro Tag und Verteilung nach Kategorie/Priorität.
+create or replace function analysis_stats(since date, until date)
+returns jsonb
+language sql
+stable
+as $$
+    with selected as (
+        select
+            a.id,
+            coalesce((a.analysis_metadata->>'edition_date')::date, a.created_at::date) as edition_date,
+            coalesce(a.analysis_metadata->>'source', 'unbekannt') as source,
+            a.total_articles,
+            a.high_priority_count,
+            a.medium_priority_count
+        from analyses a
+        where coalesce((a.analysis_metadata->>'edition_date')::date, a.created_at::date) between since and until
+    )
+    select jsonb_build_object(
+        'since', since,
+        'until', until,
+        'totals', (
+            select jsonb_build_object(
+                'analyses', count(*),
+                'articles', coalesce(sum(total_articles), 0),
+                'high_priority', coalesce(sum(high_priority_count), 0),
+                'medium_priority', coalesce(sum(medium_priority_count), 0)
+            )
+            from selected
+        ),
+        'days', coalesce((
+            select jsonb_agg(d order by d.edition_date, d.source)
+            from (
+                select edition_date, source, count(*) as analyses, sum(total_articles) as articles,
+                       sum(high_priority_count) as high_priority
+                from selected
+                group by edition_date, source
+            ) d
+        ), '[]'::jsonb),
+        'categories', coalesce((
+            select jsonb_agg(c order by c.articles desc)
+            from (
+                select ar.category, ar.priority, count(*) as articles
+                from articles ar
+                join selected s on s.id = ar.analysis_id
+                group by ar.category, ar.priority
+            ) c
+        ), '[]'::jsonb)
+    );
+$$;
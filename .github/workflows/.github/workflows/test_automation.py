@@ -29,13 +29,13 @@ def test_single_source():
     
     # PDF Download testen
     print("📥 Teste PDF-Download...")
-    pdf_content = analyzer.download_pdf(test_source)
-    if pdf_content:
-        print(f"   ✅ PDF heruntergeladen: {len(pdf_content)} bytes")
+    pdf_path = analyzer.download_pdf(test_source)
+    if pdf_path:
+        print(f"   ✅ PDF heruntergeladen: {os.path.getsize(pdf_path)} bytes")
         
         # Text-Extraktion testen
         print("📄 Teste Text-Extraktion...")
-        text = analyzer.extract_pdf_text(pdf_content)
+        text = analyzer.extract_pdf_text(pdf_path)
         if text:
             print(f"   ✅ Text extrahiert: {len(text)} Zeichen")
             
@@ -109,6 +109,114 @@ GEMINI_API_KEY=dein_gemini_api_key_hier
 # Streamlit App URL
 STREAMLIT_APP_URL=https://deine-app.streamlit.app
 
+# Optional: Modell und Chunking (CHUNK_TOKEN_BUDGET=0 nutzt das ganze Kontextfenster)
+GEMINI_MODEL=gemini-1.5-flash
+CHUNK_TOKEN_BUDGET=8000
+GEMINI_COUNT_TOKENS=false
+GEMINI_STRUCTURED_OUTPUT=true
+
+# Optional: Gemini-Parallelität und Quoten
+GEMINI_MAX_WORKERS=4
+GEMINI_MAX_RETRIES=5
+GEMINI_REQUESTS_PER_MINUTE=15
+GEMINI_TOKENS_PER_MINUTE=1000000
+
+# Optional: Detailstufe - Chunks mit Artikeln der Priorität höchste/hohe analysiert ein stärkeres Modell erneut
+# (leer = aus; eigene Parallelität und Quoten, z.B. GEMINI_DETAIL_MODEL=gemini-1.5-pro)
+GEMINI_DETAIL_MODEL=
+# Mindestzahl solcher Artikel pro Chunk (höher = weniger Detailaufrufe, geringere Kosten)
+GEMINI_DETAIL_MIN_ARTICLES=1
+GEMINI_DETAIL_MAX_WORKERS=2
+GEMINI_DETAIL_REQUESTS_PER_MINUTE=2
+GEMINI_DETAIL_TOKENS_PER_MINUTE=32000
+
+# Optional: Parallele Quellenverarbeitung
+SOURCE_CONCURRENCY=4
+HOST_DELAY_SECONDS=10
+
+# Optional: Cache für Gemini-Ergebnisse
+GEMINI_CACHE_DIR=.cache/gemini
+GEMINI_CACHE_MAX_AGE_DAYS=30
+GEMINI_CACHE_MAX_SIZE_MB=200
+GEMINI_CACHE_DISABLED=false
+
+# Optional: Prozesse für die PDF-Text-Extraktion
+PDF_EXTRACT_WORKERS=4
+
+# Optional: PDF-Download
+PDF_DOWNLOAD_DIR=.cache/pdf
+PDF_DOWNLOAD_TIMEOUT=60
+PDF_DOWNLOAD_MAX_RESUMES=3
+
+# Optional: Datenbank (RPC aus supabase_functions.sql, sonst Batch-Inserts)
+SUPABASE_SAVE_RPC=true
+ARTICLE_BATCH_SIZE=500
+
+# Optional: Deduplizierung
+DEDUP_INDEX_PATH=.cache/dedup_index.json
+DEDUP_WINDOW_DAYS=7
+DEDUP_MAX_DISTANCE=3
+DEDUP_SKIP_SEEN_CHUNKS=false
+
+# Optional: Unveränderte Seiten überspringen
+PAGE_DIFF_ENABLED=true
+PAGE_DIFF_STORE_PATH=.cache/page_fingerprints.json
+PAGE_DIFF_WINDOW_DAYS=3
+PAGE_DIFF_MAX_DISTANCE=3
+PAGE_DIFF_KEEP_CHARS=300
+
+# Optional: Batch-Modus (günstiger, Ergebnisse holt ein späterer Lauf ab; braucht google-genai)
+ANALYSIS_MODE=interactive
+BATCH_ON_WEEKENDS=false
+BATCH_STATE_DIR=.cache/batch
+
+# Optional: Checkpoints (abgebrochene Läufe setzen bei Download/Seiten/Chunks/Speicherung fort)
+CHECKPOINT_DIR=.cache/checkpoints
+CHECKPOINT_MAX_AGE_DAYS=3
+CHECKPOINT_DISABLED=false
+
+# Optional: Lokaler Relevanzfilter vor Gemini (Score < DROP verwerfen, < TRIM auf KEEP_CHARS kürzen)
+RELEVANCE_FILTER_ENABLED=true
+RELEVANCE_DROP_THRESHOLD=-0.8
+RELEVANCE_TRIM_THRESHOLD=-0.3
+RELEVANCE_KEEP_CHARS=200
+RELEVANCE_MODEL_PATH=.cache/relevance_model.json
+RELEVANCE_AUDIT_LOG=.cache/relevance_audit.jsonl
+RELEVANCE_RETRAIN_DAYS=7
+
+# Optional: Lokaler Volltext-Suchindex (python search_index.py "suchbegriff")
+SEARCH_INDEX_ENABLED=true
+SEARCH_INDEX_PATH=.cache/search_index.sqlite
+
+# Optional: Lokale Tages-Rollups (python analysis_stats.py --local --period month)
+STATS_ROLLUP_ENABLED=true
+STATS_ROLLUP_PATH=.cache/stats_rollup.sqlite
+
+# Optional: OCR für Seiten mit weniger als OCR_MIN_CHARS Zeichen (braucht pypdfium2, pytesseract, tesseract-ocr)
+OCR_ENABLED=true
+OCR_MIN_CHARS=200
+OCR_WORKERS=2
+OCR_DPI=300
+OCR_LANG=deu
+OCR_CACHE_DIR=.cache/ocr
+
+# Optional: Parquet-Export pro Ausgabe für Dashboard/Trends (python analytics_export.py, benötigt pyarrow)
+ANALYTICS_EXPORT_ENABLED=true
+ANALYTICS_EXPORT_DIR=.cache/analytics
+
+# Optional: App-Prüfung im Hintergrund (blockiert die Analyse nicht, Status im Laufbericht)
+APP_PROBE_DEADLINE_SECONDS=900
+APP_PROBE_BASE_DELAY=5
+APP_PROBE_MAX_DELAY=120
+
+# Optional: Laufbericht und Kosten (Preise in USD pro 1 Mio. Tokens)
+RUN_REPORT_PATH=run_report.json
+METRICS_PROMETHEUS_FILE=
+GEMINI_PRICE_INPUT_PER_MTOK=
+GEMINI_PRICE_OUTPUT_PER_MTOK=
+GEMINI_DETAIL_PRICE_INPUT_PER_MTOK=
+GEMINI_DETAIL_PRICE_OUTPUT_PER_MTOK=
+
 # Optional: Debugging
 DEBUG=true
 """
@@ -0,0 +1,51 @@
+# test_batch_mode.py - Job-Einträge pro Ausgabe und Zuordnung der Batch-Antworten zu Chunks
+from types import SimpleNamespace
+
+from batch_mode import SUCCEEDED, BatchCollector, BatchJobStore, GeminiBatchBackend, job_entries
+
+
+def _backend(responses):
+    """Backend ohne google-genai: der Client liefert einen fertigen Job mit den gegebenen Antworten"""
+    backend = GeminiBatchBackend.__new__(GeminiBatchBackend)
+    job = SimpleNamespace(state=SimpleNamespace(name='JOB_STATE_SUCCEEDED'),
+                          dest=SimpleNamespace(inlined_responses=responses))
+    backend.client = SimpleNamespace(batches=SimpleNamespace(get=lambda name: job))
+    return backend
+
+
+def _response(text, metadata=None):
+    return SimpleNamespace(metadata=metadata, error=None, response=SimpleNamespace(text=text))
+
+
+def test_collector_keeps_editions_of_the_same_source_apart(tmp_path):
+    collector = BatchCollector()
+    collector.add_source('A', '2024-05-01', 'a1.txt', [('k1', 'prompt 1', None)])
+    collector.add_source('A', '2024-05-02', 'a2.txt', [('k2', None, 'aus dem Cache')])
+    store = BatchJobStore(str(tmp_path))
+
+    collector.submit(lambda: SimpleNamespace(submit=lambda *args: 'batches/1'), store, 'gemini-1.5-flash')
+
+    job = store.jobs[0]
+    assert sorted((name, entry['edition_date']) for name, entry in job_entries(job)) == [
+        ('A', '2024-05-01'), ('A', '2024-05-02')
+    ]
+    assert job['request_keys'] == ['k1']
+    assert store.has_pending('A', '2024-05-02')
+
+
+def test_poll_prefers_metadata_keys():
+    backend = _backend([_response('zwei', {'key': 'k2'}), _response('eins', {'key': 'k1'})])
+
+    assert backend.poll('batches/1', ['k1', 'k2']) == (SUCCEEDED, {'k1': 'eins', 'k2': 'zwei'})
+
+
+def test_poll_maps_by_position_without_metadata():
+    backend = _backend([_response('eins'), _response('zwei')])
+
+    assert backend.poll('batches/1', ['k1', 'k2']) == (SUCCEEDED, {'k1': 'eins', 'k2': 'zwei'})
+
+
+def test_poll_drops_responses_it_cannot_assign():
+    backend = _backend([_response('eins'), _response('zwei')])
+
+    assert backend.poll('batches/1', ['k1']) == (SUCCEEDED, {'k1': 'eins'})
@@ -0,0 +1,23 @@
+# test_chunking.py - Reihenfolge und Seitenmarker beim Token-Chunking
+from chunking import TokenChunker, chunk_pages, split_pages
+
+
+def _page_text(chunks):
+    """Setzt die Seitentexte aller Chunks wieder zusammen (ohne Marker und Absatzgrenzen)"""
+    return ''.join(text.replace('\n', '') for chunk in chunks for _, text in split_pages(chunk))
+
+
+def test_split_page_keeps_input_order():
+    page = '\n\n'.join(['A' * 50, 'B' * 1000, 'C' * 50])
+    chunks = list(TokenChunker(100).iter_chunks([(1, page)]))
+
+    assert _page_text(chunks) == 'A' * 50 + 'B' * 1000 + 'C' * 50
+    assert chunks[0].startswith('=== SEITE 1 ===\n' + 'A' * 50)
+    assert all(chunk.startswith('=== SEITE 1 (Fortsetzung) ===') for chunk in chunks[1:])
+
+
+def test_small_pages_share_a_chunk():
+    chunks = list(TokenChunker(1000).iter_chunks([(1, 'Stadtrat tagt'), (2, 'Radweg kommt')]))
+
+    assert len(chunks) == 1
+    assert chunk_pages(chunks[0]) == {1, 2}
@@ -0,0 +1,60 @@
+# test_dedup.py - Zusammenführen, Reservieren und Aufräumen im Artikel-Index
+import os
+
+from dedup import ArticleDeduplicator
+
+
+def _article(title, summary='Der Stadtrat hat am Abend den Haushalt für das kommende Jahr beschlossen.',
+             priority='standard', page='1'):
+    return {'title': title, 'summary': summary, 'priority': priority, 'category': 'Kommunalpolitik',
+            'page': page, 'relevance': ''}
+
+
+def _deduplicator(tmp_path):
+    return ArticleDeduplicator(os.path.join(tmp_path, 'dedup_index.json'))
+
+
+def test_merge_duplicates_keeps_higher_priority_and_both_pages(tmp_path):
+    articles = [_article('Haushalt beschlossen', page='1'), _article('Haushalt beschlossen!', priority='höchste', page='2')]
+
+    merged = _deduplicator(tmp_path).merge_duplicates(articles)
+
+    assert len(merged) == 1
+    assert merged[0]['priority'] == 'höchste'
+    assert merged[0]['page'] == '1, 2'
+
+
+def test_claim_skips_articles_of_other_editions(tmp_path):
+    dedup = _deduplicator(tmp_path)
+
+    assert len(dedup.claim([_article('Haushalt beschlossen')], 'A', '2024-05-01')) == 1
+    assert dedup.claim([_article('Haushalt beschlossen')], 'B', '2024-05-01') == []
+    # Erneuter Versuch derselben Ausgabe behält ihre Artikel
+    assert len(dedup.claim([_article('Haushalt beschlossen')], 'A', '2024-05-01')) == 1
+
+
+def test_release_frees_articles_of_unsaved_edition(tmp_path):
+    dedup = _deduplicator(tmp_path)
+    dedup.claim([_article('Haushalt beschlossen')], 'A', '2024-05-01')
+
+    dedup.release('A', '2024-05-01')
+
+    assert len(dedup.claim([_article('Haushalt beschlossen')], 'B', '2024-05-01')) == 1
+
+
+def test_claim_ignores_entries_outside_the_window(tmp_path):
+    dedup = _deduplicator(tmp_path)
+    dedup.claim([_article('Haushalt beschlossen')], 'A', '2024-05-01')
+
+    assert len(dedup.claim([_article('Haushalt beschlossen')], 'A', '2024-06-01')) == 1
+
+
+def test_commit_keeps_backfilled_dates(tmp_path):
+    dedup = _deduplicator(tmp_path)
+    dedup.claim([_article('Haushalt beschlossen')], 'A', '2020-03-01')
+    dedup.commit()
+
+    reloaded = _deduplicator(tmp_path)
+
+    assert [entry['date'] for entry in reloaded.index['articles']] == ['2020-03-01']
+    assert reloaded.claim([_article('Haushalt beschlossen')], 'B', '2020-03-02') == []
@@ -0,0 +1,50 @@
+# test_page_diff.py - Seiten-Fingerprints werden erst nach dem Speichern der Ausgabe übernommen
+import os
+from datetime import datetime
+
+from page_diff import PageFingerprintStore
+
+PAGES = [(num, f"Seite {num} " + ' '.join(f"wort{num}x{i}" for i in range(60))) for num in (1, 2, 3)]
+
+
+def _store(tmp_path):
+    return PageFingerprintStore(os.path.join(tmp_path, 'page_fingerprints.json'))
+
+
+def _run(store, source_name, edition_date):
+    return list(store.filter_pages(iter(PAGES), source_name, edition_date, {}))
+
+
+def test_fingerprints_are_staged_until_commit(tmp_path):
+    store = _store(tmp_path)
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    assert len(_run(store, 'A', today)) == 3
+    assert store.pages == []
+    assert not os.path.exists(store.store_path)
+
+    store.commit('A', today)
+
+    assert len(_store(tmp_path).pages) == 3
+
+
+def test_excluded_pages_are_analyzed_again(tmp_path):
+    store = _store(tmp_path)
+    today = datetime.now().strftime('%Y-%m-%d')
+    _run(store, 'A', today)
+
+    store.exclude('A', today, {2})
+    store.commit('A', today)
+
+    assert [page_num for page_num, _ in _run(store, 'B', today)] == [2]
+
+
+def test_discard_drops_staged_fingerprints(tmp_path):
+    store = _store(tmp_path)
+    today = datetime.now().strftime('%Y-%m-%d')
+    _run(store, 'A', today)
+
+    store.discard('A', today)
+    store.commit('A', today)
+
+    assert store.pages == []
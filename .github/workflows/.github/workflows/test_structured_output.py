@@ -0,0 +1,32 @@
+# test_structured_output.py - Zerlegen kombinierter Gemini-Antworten (JSON, Freitext, Fehlermeldungen)
+from structured_output import articles_from_json, split_segments
+
+ARTICLE = {'category': 'Bildung', 'title': 'Neue Schule', 'summary': 'Bau beginnt', 'page': '3', 'relevance': 'Jugend'}
+
+
+def test_split_segments_keeps_json_and_text_in_order():
+    text = '[{"title": "A"}]\n\n❌ Fehler bei Chunk 2: Timeout\n\n{"articles": []}'
+
+    segments = list(split_segments(text))
+
+    assert [kind for kind, _ in segments] == ['json', 'text', 'json']
+    assert segments[1][1].strip() == '❌ Fehler bei Chunk 2: Timeout'
+
+
+def test_split_segments_treats_broken_json_as_text():
+    assert list(split_segments('[{"title": "A"')) == [('text', '[{"title": "A"')]
+
+
+def test_articles_from_json_drops_invalid_items():
+    valid, invalid = articles_from_json([ARTICLE, {'title': ''}, 'kein Objekt'])
+
+    assert valid == [ARTICLE]
+    assert invalid == 2
+
+
+def test_articles_from_json_fills_defaults():
+    valid, _ = articles_from_json({'articles': [{'title': ' Radweg '}]})
+
+    assert valid[0]['title'] == 'Radweg'
+    assert valid[0]['category'] == 'Allgemein'
+    assert valid[0]['page'] == 'nicht erkennbar'